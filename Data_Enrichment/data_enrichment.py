@@ -2,6 +2,8 @@ from aiolimiter import AsyncLimiter
 from fake_useragent import UserAgent
 from Models.models import InputModel, GoogleResponseModel
 from pathlib import Path
+from Processor.credential_pool import CredentialPool
+from Processor.file_io import append_json_array, append_to_json_array
 from typing import Dict, Optional, Any
 import aiohttp
 import asyncio
@@ -11,6 +13,9 @@ import os
 import re
 
 
+PERPLEXITY_API_URL = os.environ.get("PERPLEXITY_API_URL", "https://api.perplexity.ai/chat/completions")
+
+
 class Prompt:
     def __init__(self, company_name: str = None, company_website: str = None):
         self.company_name = company_name
@@ -132,7 +137,7 @@ class PerplexityChat:
         }
 
         try:
-            async with session.post("https://api.perplexity.ai/chat/completions", headers=headers, json=body, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
+            async with session.post(PERPLEXITY_API_URL, headers=headers, json=body, timeout=aiohttp.ClientTimeout(total=timeout)) as resp:
                 if resp.status == 200:
                     try:
                         result = await resp.json()
@@ -218,9 +223,9 @@ class PerplexityChat:
             raise ValueError(f"Error extracting valid JSON from content: {e}")
 
 
-async def data_enrichment(data: Dict[str, Any], limiter: Optional[AsyncLimiter] = None, key: str = None):
-    perplexity_api_key = os.environ.get("PERPLEXITY_API_KEY") or key
-    if not perplexity_api_key:
+async def data_enrichment(data: Dict[str, Any], limiter: Optional[AsyncLimiter] = None, key: str = None, credentials: Optional[CredentialPool] = None):
+    credentials = credentials or CredentialPool.from_env("PERPLEXITY_API_KEY", default=[key] if key else None)
+    if not credentials:
         print("Error: PERPLEXITY_API_KEY environment variable not set.")
         return
     
@@ -228,13 +233,15 @@ async def data_enrichment(data: Dict[str, Any], limiter: Optional[AsyncLimiter]
     company_website = data.get("company_website")
 
     prompt_obj = Prompt(company_name=company_name, company_website=company_website)
-    perplexity_chat = PerplexityChat(api_key=perplexity_api_key, prompt=prompt_obj)
     async with aiohttp.ClientSession() as session:
-        if limiter:
-            async with limiter:
-                content, status = await perplexity_chat.send_request(session)
-        else:
-                content, status = await perplexity_chat.send_request(session)
+        async with credentials.acquire() as credential:
+            perplexity_chat = PerplexityChat(api_key=credential.key, prompt=prompt_obj)
+            if limiter:
+                async with limiter:
+                    content, status = await perplexity_chat.send_request(session)
+            else:
+                    content, status = await perplexity_chat.send_request(session)
+            credentials.report(credential, status=status)
 
         if content and content.strip().startswith("{"):
             try:
@@ -249,20 +256,7 @@ async def data_enrichment(data: Dict[str, Any], limiter: Optional[AsyncLimiter]
                 print("Received empty or invalid response:", repr(content))
 
 def append_to_json_file(new_data, filepath):
-    if os.path.exists(filepath):
-        with open(filepath, 'r', encoding='utf-8') as f:
-            try:
-                existing_data = json.load(f)
-                if not isinstance(existing_data, list):
-                    existing_data = [existing_data]
-            except json.JSONDecodeError:
-                existing_data = []
-    else:
-        existing_data = []
-
-    existing_data.append(new_data)
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(existing_data, f, indent=4, ensure_ascii=False)
+    append_to_json_array(filepath, new_data)
 
 def read_csv_to_dicts(file_path):
     companies = []
@@ -274,9 +268,15 @@ def read_csv_to_dicts(file_path):
             companies.append({"name": name, "website": website})
     return companies
 
+def perplexity_credentials() -> CredentialPool:
+    credentials = CredentialPool.from_env("PERPLEXITY_API_KEY")
+    if not credentials:
+        raise RuntimeError("PERPLEXITY_API_KEY (or comma-separated PERPLEXITY_API_KEYS) environment variable not set.")
+    return credentials
+
 async def run_enrichment(file_path):
-    data = read_csv_to_dicts(file_path=file_path)
-    key = "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"
+    credentials = perplexity_credentials()
+    data = await asyncio.to_thread(read_csv_to_dicts, file_path)
 
     for dp in data:
         name = dp.get("name") or None
@@ -286,14 +286,14 @@ async def run_enrichment(file_path):
             company_website=website
         )
 
-        de = await data_enrichment(data=input_dp.model_dump(), key=key)
+        de = await data_enrichment(data=input_dp.model_dump(), credentials=credentials)
         de["Name"] = name
         de["Website"] = website
-        append_to_json_file(de, "perplexity_enriched_data_v2_tab_2.json")
+        await append_json_array("perplexity_enriched_data_v2_tab_2.json", de)
 
 async def main(file_path):
-    data = read_csv_to_dicts(file_path=file_path)
-    key = "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"
+    credentials = perplexity_credentials()
+    data = await asyncio.to_thread(read_csv_to_dicts, file_path)
 
     for dp in data:
         name = dp.get("name") or None
@@ -303,10 +303,10 @@ async def main(file_path):
             company_website=website
         )
 
-        de = await data_enrichment(data=input_dp.model_dump(), key=key)
+        de = await data_enrichment(data=input_dp.model_dump(), credentials=credentials)
         de["Name"] = name
         de["Website"] = website
-        append_to_json_file(de, "perplexity_enriched_data_v2_tab_2.json")
+        await append_json_array("perplexity_enriched_data_v2_tab_2.json", de)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,240 @@
+import asyncio
+import json
+import time
+import uuid
+from logging import Logger
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from company_info import GeminiChat as cigc, Prompt as cip
+from Data_Enrichment_Google.enrichment1 import Prompt, extract_json_from_markdown
+from Processor.data_pipeline import DataPipeline
+from Processor.file_io import exists, read_json, write_json
+
+
+DONE_STATES = {"JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"}
+FAILED_STATES = {"JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"}
+
+
+def batch_request(key: str, prompt: str, grounded: bool = True) -> Dict[str, Any]:
+    request: Dict[str, Any] = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+    if grounded:
+        request["tools"] = [{"google_search": {}}]
+    return {"key": key, "request": request}
+
+
+def response_text(line: Dict[str, Any]) -> str:
+    if line.get("error"):
+        raise RuntimeError(f"Batch request failed: {line['error']}")
+    candidates = (line.get("response") or {}).get("candidates") or []
+    parts = ((candidates[0].get("content") or {}).get("parts") or []) if candidates else []
+    text = "".join(part.get("text", "") for part in parts)
+    if not text:
+        raise ValueError("Batch response contained no text")
+    return text
+
+
+def write_requests(input_path: Path, prompts: Dict[str, str], grounded: bool):
+    with open(input_path, "w", encoding="utf-8") as f:
+        for key, prompt in prompts.items():
+            f.write(json.dumps(batch_request(key, prompt, grounded), ensure_ascii=False) + "\n")
+
+
+def read_outcomes(output_path: Path) -> Dict[str, Any]:
+    outcomes: Dict[str, Any] = {}
+    with open(output_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                try:
+                    outcomes[entry["key"]] = response_text(entry)
+                except Exception as e:
+                    outcomes[entry["key"]] = e
+    return outcomes
+
+
+class GeminiBatchClient:
+    def __init__(self, api_key: str):
+        from google import genai
+
+        self.client = genai.Client(api_key=api_key)
+
+    async def submit(self, input_path: Path, model: str, display_name: str) -> str:
+        uploaded = await self.client.aio.files.upload(
+            file=str(input_path),
+            config={"display_name": display_name, "mime_type": "jsonl"}
+        )
+        job = await self.client.aio.batches.create(
+            model=model,
+            src=uploaded.name,
+            config={"display_name": display_name}
+        )
+        return job.name
+
+    async def status(self, job_id: str) -> str:
+        job = await self.client.aio.batches.get(name=job_id)
+        return job.state.name if job.state else "JOB_STATE_UNSPECIFIED"
+
+    async def download(self, job_id: str, output_path: Path):
+        job = await self.client.aio.batches.get(name=job_id)
+        content = await asyncio.to_thread(self.client.files.download, file=job.dest.file_name)
+        await asyncio.to_thread(output_path.write_bytes, content)
+
+
+class FakeBatchClient:
+    def __init__(self, responder: Callable[[str], str], latency: float = 0.0):
+        self.responder = responder
+        self.latency = latency
+        self.jobs: Dict[str, Tuple[float, Path]] = {}
+
+    async def submit(self, input_path: Path, model: str, display_name: str) -> str:
+        job_id = f"batches/fake-{uuid.uuid4().hex[:12]}"
+        self.jobs[job_id] = (time.monotonic() + self.latency, input_path)
+        return job_id
+
+    async def status(self, job_id: str) -> str:
+        ready_at, _ = self.jobs[job_id]
+        return "JOB_STATE_SUCCEEDED" if time.monotonic() >= ready_at else "JOB_STATE_RUNNING"
+
+    async def download(self, job_id: str, output_path: Path):
+        _, input_path = self.jobs[job_id]
+        await asyncio.to_thread(self.respond_all, input_path, output_path)
+
+    def respond_all(self, input_path: Path, output_path: Path):
+        with open(input_path, "r", encoding="utf-8") as src, open(output_path, "w", encoding="utf-8") as dst:
+            for line in src:
+                request = json.loads(line)
+                prompt = request["request"]["contents"][0]["parts"][0]["text"]
+                try:
+                    text = self.responder(prompt)
+                    out = {"key": request["key"], "response": {"candidates": [{"content": {"parts": [{"text": text}]}}]}}
+                except Exception as e:
+                    out = {"key": request["key"], "error": {"message": str(e)}}
+                dst.write(json.dumps(out, ensure_ascii=False) + "\n")
+
+
+class BatchEnrichment:
+    def __init__(self, pipeline: DataPipeline, client, logger: Logger, CONFIG: Dict, base_data: Dict):
+        self.pipeline = pipeline
+        self.client = client
+        self.logger = logger
+        self.CONFIG = CONFIG
+        self.base_data = base_data
+        self.batch_dir: Path = CONFIG["BATCH_DIR"]
+        self.collected_files: Set[str] = set()
+
+    @staticmethod
+    def item_key(item: Dict[str, Any]) -> str:
+        return f"{item['dataset']}:{item['file']}:{item['id']}"
+
+    async def collect(self, dataset_label: str, file_path: Path) -> List[Dict[str, Any]]:
+        state = self.pipeline.state
+        processed_before = set(state.processed_files)
+        producer = asyncio.create_task(self.pipeline.producer(dataset_label, file_path))
+        items: List[Dict[str, Any]] = []
+        while not (producer.done() and self.pipeline.queue.empty()):
+            try:
+                item = await asyncio.wait_for(self.pipeline.queue.get(), timeout=0.5)
+            except asyncio.TimeoutError:
+                continue
+            self.pipeline.queue.task_done()
+            if item is not None:
+                items.append(item)
+        await producer
+        self.collected_files = state.processed_files - processed_before
+        state.processed_files = processed_before
+        return items
+
+    async def run_round(self, stage: str, prompts: Dict[str, str], grounded: bool = True) -> Dict[str, Any]:
+        self.batch_dir.mkdir(parents=True, exist_ok=True)
+        input_path = self.batch_dir / f"{stage}.input.jsonl"
+        output_path = self.batch_dir / f"{stage}.output.jsonl"
+        manifest_path = self.batch_dir / f"{stage}.manifest.json"
+
+        manifest = await read_json(manifest_path) if await exists(manifest_path) else {}
+        if manifest.get("keys") != sorted(prompts):
+            await asyncio.to_thread(write_requests, input_path, prompts, grounded)
+            job_id = await self.client.submit(input_path, self.CONFIG["BATCH_MODEL"], f"{stage}-{int(time.time())}")
+            manifest = {"job_id": job_id, "keys": sorted(prompts)}
+            await write_json(manifest_path, manifest)
+            self.logger.info(f"[Batch] Submitted {stage} job {job_id} with {len(prompts)} requests")
+        else:
+            self.logger.info(f"[Batch] Resuming {stage} job {manifest['job_id']}")
+
+        while True:
+            state = await self.client.status(manifest["job_id"])
+            if state in DONE_STATES:
+                break
+            if state in FAILED_STATES:
+                raise RuntimeError(f"Batch job {manifest['job_id']} ended in {state}")
+            self.logger.info(f"[Batch] {stage} job {manifest['job_id']} is {state}")
+            await asyncio.sleep(self.CONFIG["BATCH_POLL_INTERVAL"])
+
+        await self.client.download(manifest["job_id"], output_path)
+        return await asyncio.to_thread(read_outcomes, output_path)
+
+    async def fail(self, item: Dict[str, Any], error: BaseException):
+        self.logger.warning(f"[Batch] Item {item['id']} failed: {error.__class__.__name__}: {error}")
+        await asyncio.to_thread(self.pipeline.dead_letters.record, item, error, 1)
+
+    def parse_round(self, outcomes: Dict[str, Any], items: Dict[str, Dict[str, Any]], parse: Optional[Callable[[str], Any]]) -> Tuple[Dict[str, Any], List[Tuple[Dict[str, Any], BaseException]]]:
+        parsed: Dict[str, Any] = {}
+        failures = []
+        for key, item in items.items():
+            outcome = outcomes.get(key, KeyError(f"No batch response for {key}"))
+            if isinstance(outcome, BaseException):
+                failures.append((item, outcome))
+                continue
+            try:
+                parsed[key] = parse(outcome) if parse else outcome
+            except Exception as e:
+                failures.append((item, e))
+        return parsed, failures
+
+    async def run(self, dataset_label: str, file_path: Path, enriched_data: Path):
+        checkpoint_task = asyncio.create_task(self.pipeline.checkpointer.run(enriched_data))
+        try:
+            items = {self.item_key(item): item for item in await self.collect(dataset_label, file_path)}
+            self.logger.info(f"[Batch] Collected {len(items)} items")
+            if not items:
+                return
+
+            rounds = [
+                ("research", lambda key: cip().construct_prompt(items[key]["data"].get("name") or ""), cigc.extract_json_from_markdown),
+                ("comparison", lambda key: Prompt(
+                    company_name=items[key]["data"].get("name") or "",
+                    company_website=items[key]["data"].get("website") or ""
+                ).comparison_prompt(base_data=self.base_data, company_data=previous[key]), None),
+                ("scoring", lambda key: Prompt(
+                    company_name=items[key]["data"].get("name") or "",
+                    company_website=items[key]["data"].get("website") or ""
+                ).construct_prompt(comparison=previous[key]), extract_json_from_markdown),
+            ]
+
+            remaining = dict(items)
+            previous: Dict[str, Any] = {}
+            for stage, build_prompt, parse in rounds:
+                outcomes = await self.run_round(stage, {key: build_prompt(key) for key in remaining})
+                previous, failures = self.parse_round(outcomes, remaining, parse)
+                for item, error in failures:
+                    await self.fail(item, error)
+                remaining = {key: remaining[key] for key in previous}
+
+            ingested = 0
+            for key, result in previous.items():
+                item = items[key]
+                try:
+                    cleaned = await self.pipeline.post_process(result)
+                except Exception as e:
+                    await self.fail(item, e)
+                    continue
+                await self.pipeline.checkpointer.submit(item["dataset"], item["file"], item["id"], cleaned)
+                ingested += 1
+            self.pipeline.state.processed_files |= self.collected_files
+            self.logger.info(f"[Batch] Ingested {ingested} results, {len(items) - ingested} failed")
+            for manifest in self.batch_dir.glob("*.manifest.json"):
+                manifest.unlink()
+        finally:
+            await self.pipeline.checkpointer.close()
+            await checkpoint_task
+
@@ -1,6 +1,5 @@
 from aiolimiter import AsyncLimiter
-from google import genai
-from google.genai import types
+from Processor.backends import get_backend
 from typing import Any, Dict, Optional
 
 import json
@@ -133,29 +132,16 @@ combined_score = round( uniqueness_score*0.5 + effectiveness_score*0.3 + market_
 class GeminiChat:
     __model_name: str = "gemini-2.5-pro"
     
-    def __init__(self, api_key: str, prompt: str):
+    def __init__(self, api_key: str, prompt: str, backend=None):
         self.prompt: str = prompt
         self.api_key: str = api_key
+        self.backend = backend
 
         if not self.api_key:
             raise EnvironmentError("GEMINI_KEY environment variable not set")
 
     async def send_request(self) -> Dict[str, Any]:
-        client = genai.Client(
-            api_key=self.api_key
-        ).aio
-        grounding_tool = types.Tool(
-            google_search=types.GoogleSearch()
-        )
-        config = types.GenerateContentConfig(
-            tools=[grounding_tool]
-        )
-        response = await client.models.generate_content(
-            model=self.__model_name,
-            contents=self.prompt,
-            config=config,
-        )
-        return response.text
+        return await (self.backend or get_backend()).generate(self.api_key, self.__model_name, self.prompt)
 
 
 def extract_json_from_markdown(completion: Dict[str, Any]) -> Dict[str, Any]:
@@ -1,15 +1,22 @@
 from aiolimiter import AsyncLimiter
-from google import genai
-from google.genai import types
-from google.genai.types import GenerateContentResponse
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Union
 from company_info import GeminiChat as cigc, Prompt as cip
+from Data_Enrichment_Google.model_router import ModelRouter
+from Data_Enrichment_Google.prescreen import screened_out_record
+from Models.models import EnrichmentResponseModel
+from opentelemetry import trace
+from Processor.backends import get_backend
+from Processor.credential_pool import CredentialPool
+from Processor.hedging import Hedger
+from Processor.metrics import get_metrics
 
 import json
-import os
 import re
 
 
+tracer = trace.get_tracer(__name__)
+
+
 class Prompt:
     def __init__(self, company_name: str = "", company_website: str = ""):
         if company_name != "":
@@ -256,32 +263,20 @@ NB:
 class GeminiChat:
     __model_name: str = "gemini-2.5-pro"
     
-    def __init__(self, api_key: str, prompt: str):
+    def __init__(self, api_key: str, prompt: str, model_name: Optional[str] = None, grounded: bool = True, backend=None):
         self.prompt: str = prompt
         self.api_key: str = api_key
+        self.model_name: str = model_name or self.__model_name
+        self.grounded: bool = grounded
+        self.backend = backend
 
         if not self.api_key:
             raise EnvironmentError("GEMINI_KEY environment variable not set")
 
     async def send_request(self) -> Dict[str, Any]:
-        client = genai.Client(
-            api_key=self.api_key
-        ).aio
-
         try:
-            grounding_tool = types.Tool(
-                google_search=types.GoogleSearch()
-            )
-            config = types.GenerateContentConfig(
-                tools=[grounding_tool]
-            )
-
-            response: GenerateContentResponse = await client.models.generate_content(
-                model=self.__model_name,
-                contents=self.prompt,
-                config=config,
-            )
-            return response.text
+            with tracer.start_as_current_span("llm.send_request", attributes={"model": self.model_name, "grounded": self.grounded}):
+                return await (self.backend or get_backend()).generate(self.api_key, self.model_name, self.prompt, self.grounded)
         except Exception as e:
             print(f"An error occurred during content generation: {e}")
             raise
@@ -326,71 +321,133 @@ def extract_json_from_markdown(completion: Dict[str, Any]) -> Dict[str, Any]:
     except Exception as e:
         raise ValueError(f"Error extracting valid JSON from content: {e}")
 
-async def get_company_data(name: str, api_key: str) -> Dict:
+_credentials: Optional[CredentialPool] = None
+_hedger: Optional[Hedger] = None
+_router: Optional[ModelRouter] = None
+
+
+def default_credentials() -> CredentialPool:
+    global _credentials
+    if _credentials is None:
+        _credentials = CredentialPool.from_env("GEMINI_KEY")
+    return _credentials
+
+def default_hedger() -> Hedger:
+    global _hedger
+    if _hedger is None:
+        _hedger = Hedger()
+    return _hedger
+
+async def send_with_pool(credentials: CredentialPool, prompt: str, chat_cls=None, stage: str = "default", hedger: Optional[Hedger] = None, **chat_kwargs) -> str:
+    async def attempt() -> str:
+        async with credentials.acquire() as credential:
+            chat = (chat_cls or GeminiChat)(api_key=credential.key, prompt=prompt, **chat_kwargs)
+            metrics = get_metrics()
+            try:
+                with metrics.timer("llm_call_seconds", stage=stage, model=getattr(chat, "model_name", "")):
+                    response = await chat.send_request()
+            except Exception as e:
+                metrics.inc("llm_calls_total", stage=stage, outcome="error")
+                credentials.report(credential, e)
+                raise
+            metrics.inc("llm_calls_total", stage=stage, outcome="ok")
+            credentials.report(credential)
+            return response
+
+    return await (hedger or default_hedger()).call(stage, attempt)
+
+def default_router() -> ModelRouter:
+    global _router
+    if _router is None:
+        _router = ModelRouter()
+    return _router
+
+async def routed_request(credentials: CredentialPool, prompt: str, stage: str, hedger: Optional[Hedger] = None, router: Optional[ModelRouter] = None, chat_cls=None, parse=None, validate=None):
+    async def call(model_name: str) -> str:
+        return await send_with_pool(credentials, prompt, chat_cls=chat_cls, stage=stage, hedger=hedger, model_name=model_name)
+
+    def timed_parse(response: str):
+        with tracer.start_as_current_span("parse", attributes={"stage": stage}), get_metrics().timer("parse_seconds", stage=stage):
+            return parse(response)
+
+    with tracer.start_as_current_span("llm.stage", attributes={"stage": stage}):
+        return await (router or default_router()).run(stage, call, parse=timed_parse if parse else None, validate=validate)
+
+def validate_enrichment(parsed: Dict[str, Any]) -> Dict[str, Any]:
+    if parsed.get("prescreened"):
+        return parsed
+    return EnrichmentResponseModel.model_validate(parsed).model_dump()
+
+async def get_company_data(name: str, credentials: CredentialPool, hedger: Optional[Hedger] = None, router: Optional[ModelRouter] = None) -> Dict:
     prompt = cip().construct_prompt(name)
-    chat = cigc(
-        api_key=api_key,
-        prompt=prompt
+    _, company_data = await routed_request(
+        credentials, prompt, "research", hedger, router,
+        chat_cls=cigc, parse=cigc.extract_json_from_markdown
     )
+    return company_data
 
-    resp = await chat.send_request()
-    return chat.extract_json_from_markdown(resp)
-
-async def run_enrichment(logger, data: Dict[str, Any], limiter: Optional[AsyncLimiter] = None, base_data: Dict = {}) -> Optional[Dict[str, Any]]:
-    gemini_api_key = os.environ.get("GEMINI_KEY")
+async def run_enrichment(logger, data: Dict[str, Any], limiter: Optional[AsyncLimiter] = None, base_data: Dict = {}, credentials: Optional[CredentialPool] = None, hedger: Optional[Hedger] = None, prescreen=None, router: Optional[ModelRouter] = None, raw: bool = False) -> Optional[Union[Dict[str, Any], str]]:
+    credentials = credentials or default_credentials()
     extracted_data = None
+    deferred = raw and len((router or default_router()).cascade("scoring")) == 1
 
-    if not gemini_api_key:
+    if not credentials:
         logger.error("Error: GEMINI_KEY environment variable not set.")
         return
 
     name: str = data.get("name") or ""
     website: str = data.get("website") or ""
 
+    if prescreen:
+        plausible, reason = await prescreen.classify(data)
+        if not plausible:
+            logger.info(f"Pre-screen skipped {name}: {reason}")
+            return screened_out_record(data, reason)
+
     try:
-        company_data = await get_company_data(name, gemini_api_key)
+        company_data = await get_company_data(name, credentials, hedger, router)
         prompt = Prompt(company_name=name, company_website=website)
         logger.info(f"Processing: {name}")
 
         if limiter:
-            async with limiter:
-                pass
-                comparison = GeminiChat(
-                    api_key=gemini_api_key,
-                    prompt=prompt.comparison_prompt(base_data=base_data, company_data=company_data)
-                )
-                comparison_response = await comparison.send_request()
-                gemini_enchriment = GeminiChat(
-                    api_key=gemini_api_key,
-                    prompt=prompt.construct_prompt(comparison=comparison_response)
-                )
-                response = await gemini_enchriment.send_request()
-                if response:
-                    extracted_data = extract_json_from_markdown(response)
-                else:
-                    logger.warning(f"No result for {name}")
-        else:
-            response = await gemini_enchriment.send_request()
+            await limiter.acquire()
+        comparison_response, _ = await routed_request(
+            credentials,
+            prompt.comparison_prompt(base_data=base_data, company_data=company_data),
+            "comparison", hedger, router
+        )
+        response, extracted_data = await routed_request(
+            credentials,
+            prompt.construct_prompt(comparison=comparison_response),
+            "scoring", hedger, router,
+            parse=None if deferred else lambda r: extract_json_from_markdown(r) if r else None,
+            validate=None if deferred else validate_enrichment
+        )
+        if not response:
+            logger.warning(f"No result for {name}")
+        elif deferred:
+            extracted_data = response
 
     except Exception as e:
-        print(f"Attempt failed: {e}")
+        logger.warning(f"Attempt failed for {name}: {e.__class__.__name__}: {e}")
+        raise
     return extracted_data
 
-async def compare_companies(logger, my_data: Dict[str, Any], companies_list: List[Dict[str, Any]] = [{}]) -> Optional[Dict[str, Any]]:
-    gemini_api_key = os.environ.get("GEMINI_KEY")
+async def compare_companies(logger, my_data: Dict[str, Any], companies_list: List[Dict[str, Any]] = [{}], credentials: Optional[CredentialPool] = None, hedger: Optional[Hedger] = None, router: Optional[ModelRouter] = None) -> Optional[Dict[str, Any]]:
+    credentials = credentials or default_credentials()
     extracted_data = None
 
-    if not gemini_api_key:
+    if not credentials:
         logger.error("Error: GEMINI_KEY environment variable not set.")
         return
 
     try:
         prompt = Prompt()
-        compare_chat = GeminiChat(
-                api_key=gemini_api_key,
-                prompt=prompt.compare_companies(my_data=my_data, data=companies_list)
-            )
-        resp = await compare_chat.send_request()
+        resp, _ = await routed_request(
+            credentials,
+            prompt.compare_companies(my_data=my_data, data=companies_list),
+            "rescoring", hedger, router
+        )
         if resp:
             extracted_data = extract_json_from_markdown(resp)
     except Exception as e:
@@ -0,0 +1,96 @@
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+DEFAULT_MODEL = "gemini-2.5-pro"
+
+
+@dataclass
+class TierStats:
+    calls: int = 0
+    failures: int = 0
+    latency: float = 0.0
+    escalations: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+class ModelRouter:
+    def __init__(self, cascades: Optional[Dict[str, List[str]]] = None, costs: Optional[Dict[str, float]] = None,
+                 threshold: float = 6, margin: float = 1):
+        self.cascades = cascades or {}
+        self.costs = costs or {}
+        self.threshold = threshold
+        self.margin = margin
+        self.stats_by_tier: Dict[Tuple[str, str], TierStats] = defaultdict(TierStats)
+
+    @classmethod
+    def from_config(cls, CONFIG: Dict) -> "ModelRouter":
+        return cls(
+            cascades=CONFIG.get("MODEL_CASCADES"),
+            costs=CONFIG.get("MODEL_COSTS"),
+            threshold=CONFIG.get("ESCALATION_THRESHOLD", 6),
+            margin=CONFIG.get("ESCALATION_MARGIN", 1),
+        )
+
+    def cascade(self, stage: str) -> List[str]:
+        return self.cascades.get(stage) or [DEFAULT_MODEL]
+
+    def escalation_reason(self, parsed: Any) -> Optional[str]:
+        if not isinstance(parsed, dict):
+            return None
+        if str(parsed.get("confidence", "")).strip().lower() == "low":
+            return "low_confidence"
+        score = parsed.get("combined_score")
+        if isinstance(score, (int, float)) and abs(score - self.threshold) <= self.margin:
+            return "near_threshold"
+        return None
+
+    async def run(self, stage: str, call: Callable[[str], Awaitable[str]], parse: Optional[Callable[[str], Any]] = None,
+                  validate: Optional[Callable[[Any], Any]] = None) -> Tuple[str, Any]:
+        models = self.cascade(stage)
+        for i, model in enumerate(models):
+            last = i == len(models) - 1
+            stats = self.stats_by_tier[(stage, model)]
+            stats.calls += 1
+            started = time.monotonic()
+            try:
+                response = await call(model)
+            except Exception:
+                stats.failures += 1
+                stats.latency += time.monotonic() - started
+                if last:
+                    raise
+                stats.escalations["error"] += 1
+                continue
+            stats.latency += time.monotonic() - started
+
+            parsed = None
+            if parse:
+                try:
+                    parsed = parse(response)
+                    if validate and not last:
+                        validate(parsed)
+                except Exception:
+                    if last:
+                        raise
+                    stats.escalations["invalid"] += 1
+                    continue
+
+            reason = None if last else self.escalation_reason(parsed)
+            if reason:
+                stats.escalations[reason] += 1
+                continue
+            return response, parsed
+
+    def stats(self) -> Dict[str, Dict]:
+        report: Dict[str, Dict] = {}
+        for (stage, model), stats in self.stats_by_tier.items():
+            report.setdefault(stage, {})[model] = {
+                "calls": stats.calls,
+                "failures": stats.failures,
+                "mean_latency": stats.latency / stats.calls if stats.calls else None,
+                "escalations": dict(stats.escalations),
+                "cost": stats.calls * self.costs.get(model, 1.0),
+            }
+        return report
@@ -0,0 +1,136 @@
+import json
+import sys
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from Models.models import GoogleResponseModel
+from Processor.credential_pool import CredentialPool
+from Processor.hedging import Hedger
+from Processor.scheduling import NEGATIVE_TERMS, POSITIVE_TERMS, term_score
+
+
+IN_SCOPE_RELEVANCE = {"INVESTMENT", "ADJACENT", "FUTURE"}
+
+
+def load_descriptions(results_path: Path) -> Dict[str, str]:
+    descriptions: Dict[str, str] = {}
+    if not Path(results_path).exists():
+        return descriptions
+    with open(results_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for record in json.loads(line):
+                name = (record.get("company_name") or "").lower()
+                if name and record.get("brief_description"):
+                    descriptions[name] = record["brief_description"]
+    return descriptions
+
+
+def load_inputs(input_dir: Path) -> Dict[str, Dict[str, Any]]:
+    inputs: Dict[str, Dict[str, Any]] = {}
+    for path in sorted(Path(input_dir).glob("*.json")):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for item in (data.values() if isinstance(data, dict) else data if isinstance(data, list) else []):
+            if isinstance(item, dict) and item.get("name"):
+                inputs[item["name"].lower()] = item
+    return inputs
+
+
+class KeywordPreScreener:
+    def __init__(self, descriptions: Optional[Dict[str, str]] = None, exclude_at: int = 3):
+        self.descriptions = descriptions or {}
+        self.exclude_at = exclude_at
+
+    async def classify(self, data: Dict[str, Any]) -> Tuple[bool, str]:
+        name = data.get("name") or ""
+        text = f"{name} {data.get('website') or ''} {self.descriptions.get(name.lower(), '')}"
+        positive = term_score(text, POSITIVE_TERMS)
+        negative = term_score(text, NEGATIVE_TERMS)
+        if positive == 0 and negative >= self.exclude_at:
+            return False, f"out-of-scope keywords (score -{negative})"
+        return True, f"keyword score +{positive}/-{negative}"
+
+
+class ModelPreScreener:
+    PROMPT = """
+You are screening companies for a hard-tech investment thesis: mobility, batteries and energy storage, hydrogen,
+propulsion, charging, sustainable materials, circular economy, manufacturing tech, space, quantum and similar deep tech.
+Pure software/SaaS, cybersecurity, fintech, healthcare/medtech, biotech, pharma and food tech are out of scope.
+
+Company Name: {name}
+Company Website: {website}
+Known description: {description}
+
+Answer with a JSON object: {{"plausible": true or false, "reason": "at most 15 words"}}.
+When unsure, answer plausible=true.
+""".strip()
+
+    def __init__(self, credentials: CredentialPool, model_name: str = "gemini-2.5-flash-lite",
+                 hedger: Optional[Hedger] = None, descriptions: Optional[Dict[str, str]] = None):
+        self.credentials = credentials
+        self.model_name = model_name
+        self.hedger = hedger
+        self.descriptions = descriptions or {}
+
+    async def classify(self, data: Dict[str, Any]) -> Tuple[bool, str]:
+        from Data_Enrichment_Google.enrichment1 import extract_json_from_markdown, send_with_pool
+
+        name = data.get("name") or ""
+        prompt = self.PROMPT.format(
+            name=name,
+            website=data.get("website") or "N/A",
+            description=self.descriptions.get(name.lower(), "N/A")
+        )
+        try:
+            response = await send_with_pool(
+                self.credentials, prompt, stage="prescreen", hedger=self.hedger,
+                model_name=self.model_name, grounded=False
+            )
+            verdict = extract_json_from_markdown(response)
+        except Exception as e:
+            return True, f"pre-screen unavailable ({e.__class__.__name__})"
+        return verdict.get("plausible") is not False, verdict.get("reason", "")
+
+
+def screened_out_record(data: Dict[str, Any], reason: str) -> Dict[str, Any]:
+    return {
+        **dict.fromkeys(GoogleResponseModel.model_fields),
+        "company_name": data.get("name") or "",
+        "relevance": "FALSE",
+        "explanation": f"Pre-screen: {reason}",
+        "prescreened": True
+    }
+
+
+async def evaluate(screener, results_path: Path, inputs: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+    inputs = inputs or {}
+    counts = {"tp": 0, "fp": 0, "fn": 0, "tn": 0}
+    with open(results_path, "r", encoding="utf-8") as f:
+        records = [record for line in f if line.strip() for record in json.loads(line)]
+    for record in records:
+        if record.get("prescreened") or not isinstance(record.get("relevance"), str):
+            continue
+        actual = record["relevance"].strip().upper() in IN_SCOPE_RELEVANCE
+        name = record.get("company_name") or ""
+        predicted, _ = await screener.classify(inputs.get(name.lower()) or {"name": name})
+        counts[("t" if predicted == actual else "f") + ("p" if predicted else "n")] += 1
+    total = sum(counts.values())
+    return dict(
+        counts,
+        total=total,
+        precision=counts["tp"] / (counts["tp"] + counts["fp"]) if counts["tp"] + counts["fp"] else None,
+        recall=counts["tp"] / (counts["tp"] + counts["fn"]) if counts["tp"] + counts["fn"] else None,
+        skip_rate=(counts["tn"] + counts["fn"]) / total if total else None,
+    )
+
+
+if __name__ == "__main__":
+    import asyncio
+
+    path = Path(sys.argv[1] if len(sys.argv) > 1 else "data/GED.json")
+    input_dir = Path(sys.argv[2] if len(sys.argv) > 2 else "data")
+    screener = KeywordPreScreener(load_descriptions(path))
+    report = asyncio.run(evaluate(screener, path, load_inputs(input_dir)))
+    print(json.dumps(report, indent=2))
@@ -1,5 +1,5 @@
 from datetime import date
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 from typing import Optional, Literal, List 
 
 
@@ -65,3 +65,15 @@ class GoogleResponseModel(BaseModel):
     core_technology_used: str
     known_development_stage: str
     action: str
+
+
+class EnrichmentResponseModel(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    company_name: str
+    relevance: Literal["ADJACENT", "FALSE", "FUTURE", "INVESTMENT", "TOOL"]
+    uniqueness_score: int = Field(..., ge=0, le=10)
+    effectiveness_score: int = Field(..., ge=0, le=10)
+    market_diff_score: int = Field(..., ge=0, le=10)
+    combined_score: int = Field(..., ge=0, le=10)
+    confidence: str
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import json
+import os
+import random
+from filelock import FileLock
+from pathlib import Path
+from Processor.metrics import get_metrics
+from typing import Dict, List, Optional
+
+
+STAGE_MARKERS = {
+    "Comparison Dictionary": "scoring",
+    "Company A Data": "comparison",
+    "expert data researcher": "research",
+    "re-evaluate the uniqueness": "rescoring",
+    "screening companies": "prescreen",
+}
+
+
+class BackendError(RuntimeError):
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+def prompt_hash(prompt: str) -> str:
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+
+
+def prompt_stage(prompt: str) -> str:
+    for marker, stage in STAGE_MARKERS.items():
+        if marker in prompt:
+            return stage
+    return "default"
+
+
+class GeminiBackend:
+    def __init__(self, base_url: Optional[str] = None):
+        self.base_url = base_url or os.environ.get("GEMINI_BASE_URL")
+
+    async def generate(self, api_key: str, model: str, prompt: str, grounded: bool = True) -> str:
+        from google import genai
+        from google.genai import types
+
+        http_options = types.HttpOptions(base_url=self.base_url) if self.base_url else None
+        client = genai.Client(api_key=api_key, http_options=http_options).aio
+        config = types.GenerateContentConfig(
+            tools=[types.Tool(google_search=types.GoogleSearch())] if grounded else None
+        )
+        response = await client.models.generate_content(
+            model=model,
+            contents=prompt,
+            config=config,
+        )
+        usage = response.usage_metadata
+        if usage:
+            metrics = get_metrics()
+            metrics.inc("llm_tokens_total", usage.prompt_token_count or 0, model=model, kind="prompt")
+            metrics.inc("llm_tokens_total", usage.candidates_token_count or 0, model=model, kind="completion")
+        return response.text
+
+
+class ReplayBackend:
+    def __init__(self, recordings: Path, latency_median: float = 1.0, latency_sigma: float = 0.5,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, seed: Optional[int] = None):
+        self.by_hash: Dict[str, str] = {}
+        self.by_stage: Dict[str, List[str]] = {}
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+        with open(recordings, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                if entry.get("prompt_hash"):
+                    self.by_hash[entry["prompt_hash"]] = entry["response"]
+                self.by_stage.setdefault(entry.get("stage", "default"), []).append(entry["response"])
+
+    @classmethod
+    def from_env(cls) -> Optional["ReplayBackend"]:
+        path = os.environ.get("REPLAY_RECORDINGS")
+        if not path:
+            return None
+        return cls(
+            Path(path),
+            latency_median=float(os.environ.get("REPLAY_LATENCY_MEDIAN", 1.0)),
+            latency_sigma=float(os.environ.get("REPLAY_LATENCY_SIGMA", 0.5)),
+            error_rate=float(os.environ.get("REPLAY_ERROR_RATE", 0.0)),
+            rate_limit_rate=float(os.environ.get("REPLAY_RATE_LIMIT_RATE", 0.0)),
+        )
+
+    def latency(self) -> float:
+        if self.latency_median <= 0:
+            return 0.0
+        return self.random.lognormvariate(0.0, self.latency_sigma) * self.latency_median
+
+    def respond(self, prompt: str) -> str:
+        self.calls += 1
+        roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            raise BackendError(429, "RESOURCE_EXHAUSTED: replayed rate limit")
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise BackendError(503, "UNAVAILABLE: replayed backend error")
+        recorded = self.by_hash.get(prompt_hash(prompt))
+        if recorded is not None:
+            return recorded
+        candidates = self.by_stage.get(prompt_stage(prompt)) or self.by_stage.get("default")
+        if not candidates:
+            raise BackendError(404, f"No recording for stage {prompt_stage(prompt)}")
+        return candidates[self.calls % len(candidates)]
+
+    async def generate(self, api_key: str, model: str, prompt: str, grounded: bool = True) -> str:
+        await asyncio.sleep(self.latency())
+        return self.respond(prompt)
+
+
+class RecordingBackend:
+    def __init__(self, inner, path: Path):
+        self.inner = inner
+        self.path = Path(path)
+
+    def record(self, model: str, prompt: str, response: str):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with FileLock(f"{self.path}.lock"):
+            with open(self.path, "a", encoding="utf-8") as f:
+                json.dump({
+                    "prompt_hash": prompt_hash(prompt),
+                    "stage": prompt_stage(prompt),
+                    "model": model,
+                    "response": response
+                }, f, ensure_ascii=False)
+                f.write("\n")
+
+    async def generate(self, api_key: str, model: str, prompt: str, grounded: bool = True) -> str:
+        response = await self.inner.generate(api_key, model, prompt, grounded)
+        await asyncio.to_thread(self.record, model, prompt, response)
+        return response
+
+
+_backend = None
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = ReplayBackend.from_env() or GeminiBackend()
+    return _backend
@@ -0,0 +1,102 @@
+import asyncio
+from dataclasses import dataclass
+from logging import Logger
+from opentelemetry import trace
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from Processor.checkpoint_processor import ProcessingState
+from Processor.metrics import MetricsRegistry, get_metrics
+
+
+tracer = trace.get_tracer(__name__)
+
+
+@dataclass
+class CompletionEvent:
+    dataset: str
+    file: str
+    item_id: Any
+    result: Dict[str, Any]
+
+
+class CheckpointCoordinator:
+    def __init__(self, state: ProcessingState, logger: Logger, CONFIG: Dict, metrics: Optional[MetricsRegistry] = None):
+        self.state = state
+        self.metrics = metrics or get_metrics()
+        self.logger = logger
+        self.CONFIG = CONFIG
+        self.events: asyncio.Queue = asyncio.Queue()
+        self.results: List[Dict[str, Any]] = []
+        self.keys: List[Tuple[str, Any]] = []
+        self.pending = 0
+        self.task: Optional[asyncio.Task] = None
+        self.stopped = False
+
+    async def submit(self, dataset: str, _file: str, item_id: Any, result: Dict[str, Any]):
+        await self.events.put(CompletionEvent(dataset, _file, item_id, result))
+
+    async def close(self):
+        await self.events.put(None)
+
+    async def sync(self):
+        if self.stopped or (self.task is not None and self.task.done()):
+            raise RuntimeError("Checkpoint coordinator is not running")
+        done = asyncio.get_running_loop().create_future()
+        await self.events.put(done)
+        await done
+
+    def apply(self, event: CompletionEvent):
+        key = f"{event.dataset}:{event.file}"
+        self.state.processed_items.setdefault(key, set()).add(event.item_id)
+        self.state.total_processed += 1
+        self.results.append(event.result)
+        self.keys.append((key, event.item_id))
+        self.pending += 1
+        if self.state.total_processed % 100 == 0:
+            self.logger.info(f"[Checkpoint] Total processed so far: {self.state.total_processed}")
+
+    async def flush(self, path: Path):
+        batch, self.results = self.results, []
+        keys, self.keys = self.keys, []
+        count = len(batch)
+        self.pending = 0
+        snapshot = self.state.snapshot()
+        with tracer.start_as_current_span("checkpoint.flush", attributes={"results": count}), self.metrics.timer("write_seconds"):
+            await asyncio.to_thread(self.state.save_checkpoint, self.logger, self.CONFIG, batch, path, snapshot, keys)
+        self.metrics.inc("results_written_total", count)
+        self.logger.info(f"[Checkpoint] Saved {count} results to file.")
+
+    async def run(self, path: Path):
+        self.task = asyncio.current_task()
+        interval = self.CONFIG["CHECKPOINT_INTERVAL"]
+        done = False
+        try:
+            while not done:
+                event: Optional[CompletionEvent] = await self.events.get()
+                while event is not None:
+                    if isinstance(event, asyncio.Future):
+                        try:
+                            await self.flush(path)
+                        except Exception as e:
+                            event.set_exception(e)
+                            raise
+                        event.set_result(None)
+                    else:
+                        self.apply(event)
+                    if self.pending >= interval:
+                        await self.flush(path)
+                    if self.events.empty():
+                        break
+                    event = self.events.get_nowait()
+                done = event is None
+        finally:
+            try:
+                await self.flush(path)
+                self.logger.info("[Checkpoint] Final flush complete")
+            finally:
+                self.stopped = True
+                while not self.events.empty():
+                    event = self.events.get_nowait()
+                    if isinstance(event, asyncio.Future) and not event.done():
+                        event.set_exception(RuntimeError("Checkpoint coordinator stopped"))
@@ -16,29 +16,39 @@ class ProcessingState:
     current_file: Optional[str] = None
     total_processed: int = 0
     total_items: int = 0
+    file_totals: Dict[str, int] = field(default_factory=dict)
     started_at: float = field(default_factory=time.monotonic)
 
     def append_to_json_file(self, new_data: Dict, filepath: Path):
-        with FileLock(filepath):
+        with FileLock(f"{filepath}.lock"):
             with open(filepath, 'a', encoding='utf-8') as f:
                 json.dump(new_data, f, ensure_ascii=False)
                 f.write('\n')
 
-    def save_checkpoint(self, logger: Logger, CONFIG: Dict, results: List, path: Path):
-        CONFIG["CHECKPOINT_DIR"].mkdir(parents=True, exist_ok=True)
-        tmp_file = CONFIG["CHECKPOINT_DIR"] / "processing_state.tmp"
-        final_file = CONFIG["CHECKPOINT_DIR"] / "processing_state.json"
-        data = {
+    def set_file_total(self, key: str, count: int):
+        self.file_totals[key] = count
+        self.total_items = sum(self.file_totals.values())
+
+    def snapshot(self) -> Dict:
+        return {
             "processed_files": list(self.processed_files),
             "processed_items": {k: list(v) for k, v in self.processed_items.items()},
             "current_file": self.current_file,
             "total_processed": self.total_processed,
             "total_items": self.total_items,
+            "file_totals": dict(self.file_totals),
             "timestamp": datetime.datetime.now().isoformat()
         }
+
+    def save_checkpoint(self, logger: Logger, CONFIG: Dict, results: List, path: Path, data: Optional[Dict] = None, keys: Optional[List] = None):
+        CONFIG["CHECKPOINT_DIR"].mkdir(parents=True, exist_ok=True)
+        tmp_file = CONFIG["CHECKPOINT_DIR"] / "processing_state.tmp"
+        final_file = CONFIG["CHECKPOINT_DIR"] / "processing_state.json"
+        data = data or self.snapshot()
         with open(tmp_file, "w") as f:
             json.dump(data, f, indent=2)
-        self.append_to_json_file(results, path)
+        if results:
+            self.append_to_json_file(results, path)
         results.clear()
         os.replace(tmp_file, final_file)
         logger.info(f"Checkpoint saved: {self.total_processed}/{self.total_items} items processed")
@@ -57,6 +67,7 @@ class ProcessingState:
             state.processed_items = {k: set(v) for k, v in data.get("processed_items", {}).items()}
             state.current_file = data.get("current_file")
             state.total_processed = data.get("total_processed", 0)
+            state.file_totals = data.get("file_totals", {})
             state.total_items = data.get("total_items", 0)
             logger.info(f"Checkpoint loaded: {state.total_processed}/{state.total_items} items already processed")
             return state
@@ -0,0 +1,98 @@
+import time
+from collections import deque
+from logging import Logger
+from typing import Callable, Deque, Dict, List, Optional
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Circuit open, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_ratio: float = 0.5, min_calls: int = 10, window: int = 50,
+                 open_seconds: float = 60.0, half_open_max: int = 1, logger: Optional[Logger] = None):
+        self.failure_ratio = failure_ratio
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max = half_open_max
+        self.logger = logger
+        self.state = self.CLOSED
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+        self.opened_at = 0.0
+        self.probes = 0
+        self.listeners: List[Callable[[str, str, Dict], None]] = []
+
+    @classmethod
+    def from_config(cls, CONFIG: Dict, logger: Optional[Logger] = None) -> "CircuitBreaker":
+        return cls(
+            failure_ratio=CONFIG.get("BREAKER_FAILURE_RATIO", 0.5),
+            min_calls=CONFIG.get("BREAKER_MIN_CALLS", 10),
+            window=CONFIG.get("BREAKER_WINDOW", 50),
+            open_seconds=CONFIG.get("BREAKER_OPEN_SECONDS", 60.0),
+            logger=logger,
+        )
+
+    def add_listener(self, listener: Callable[[str, str, Dict], None]):
+        self.listeners.append(listener)
+
+    def failure_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def transition(self, state: str):
+        previous, self.state = self.state, state
+        if state == self.OPEN:
+            self.opened_at = time.monotonic()
+        if state != self.OPEN:
+            self.probes = 0
+        if state == self.CLOSED:
+            self.outcomes.clear()
+        details = {"failure_rate": self.failure_rate(), "calls": len(self.outcomes)}
+        if self.logger:
+            self.logger.warning(f"[Circuit] {previous} -> {state} (failure rate {details['failure_rate']:.0%})")
+        for listener in self.listeners:
+            listener(previous, state, details)
+
+    def retry_after(self) -> float:
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == self.OPEN and self.retry_after() == 0.0:
+            self.transition(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            if self.probes < self.half_open_max:
+                self.probes += 1
+                return True
+            return False
+        return self.state == self.CLOSED
+
+    def check(self):
+        if not self.allow():
+            raise CircuitOpenError(self.retry_after() or self.open_seconds / 10)
+
+    def release(self):
+        if self.state == self.HALF_OPEN and self.probes:
+            self.probes -= 1
+
+    def record_success(self):
+        if self.state == self.HALF_OPEN:
+            self.transition(self.CLOSED)
+            return
+        self.outcomes.append(True)
+
+    def record_failure(self):
+        if self.state == self.HALF_OPEN:
+            self.transition(self.OPEN)
+            return
+        self.outcomes.append(False)
+        if self.state == self.CLOSED and len(self.outcomes) >= self.min_calls and self.failure_rate() >= self.failure_ratio:
+            self.transition(self.OPEN)
@@ -0,0 +1,81 @@
+import asyncio
+import math
+import time
+from collections import deque
+from logging import Logger
+from typing import Deque, Dict, Optional, Tuple
+
+
+class ConcurrencyController:
+    def __init__(self, pipeline, logger: Logger, min_workers: int, max_workers: int, target_rate: float,
+                 error_threshold: float = 0.2, interval: float = 10.0, window: float = 60.0):
+        self.pipeline = pipeline
+        self.logger = logger
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.target_rate = target_rate
+        self.error_threshold = error_threshold
+        self.interval = interval
+        self.window = window
+        self.samples: Deque[Tuple[float, float, bool]] = deque()
+        self.last_target: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, pipeline, logger: Logger, CONFIG: Dict, rate_limit: Optional[Tuple[float, float]]) -> "ConcurrencyController":
+        target_rate = CONFIG.get("TARGET_RATE") or (rate_limit[0] / rate_limit[1] if rate_limit else CONFIG["MAX_WORKERS"])
+        return cls(
+            pipeline,
+            logger,
+            min_workers=CONFIG["MIN_WORKERS"],
+            max_workers=CONFIG["MAX_WORKERS"],
+            target_rate=target_rate,
+            error_threshold=CONFIG.get("ERROR_THRESHOLD", 0.2),
+            interval=CONFIG.get("CONCURRENCY_INTERVAL", 10.0),
+        )
+
+    def record(self, latency: float, ok: bool):
+        self.samples.append((time.monotonic(), latency, ok))
+
+    def trim(self, now: float):
+        while self.samples and now - self.samples[0][0] > self.window:
+            self.samples.popleft()
+
+    def snapshot(self) -> Dict:
+        now = time.monotonic()
+        self.trim(now)
+        completed = len(self.samples)
+        errors = sum(1 for _, _, ok in self.samples if not ok)
+        latencies = [latency for _, latency, ok in self.samples if ok]
+        span = max(now - self.samples[0][0], self.interval) if self.samples else self.window
+        return {
+            "workers": self.pipeline.active_workers(),
+            "target": self.last_target,
+            "queue_depth": self.pipeline.queue.qsize(),
+            "throughput": completed / span,
+            "mean_latency": sum(latencies) / len(latencies) if latencies else None,
+            "error_rate": errors / completed if completed else 0.0,
+        }
+
+    def target(self, stats: Dict) -> int:
+        current = stats["workers"]
+        if stats["mean_latency"] is None:
+            desired = current
+        else:
+            desired = math.ceil(self.target_rate * stats["mean_latency"])
+        if stats["error_rate"] > self.error_threshold:
+            desired = min(desired, current // 2)
+        desired = min(desired, current * 2 + 1, current + stats["queue_depth"])
+        return max(self.min_workers, min(self.max_workers, desired))
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            stats = self.snapshot()
+            self.last_target = self.target(stats)
+            if self.last_target != stats["workers"]:
+                self.pipeline.scale_consumers(self.last_target)
+            latency = f"{stats['mean_latency']:.1f}s" if stats["mean_latency"] is not None else "n/a"
+            self.logger.info(
+                f"[Concurrency] workers={stats['workers']}->{self.last_target} queue={stats['queue_depth']} "
+                f"throughput={stats['throughput']:.2f}/s latency={latency} errors={stats['error_rate']:.0%}"
+            )
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import time
+from aiolimiter import AsyncLimiter
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+
+CREDENTIAL_ERROR_STATUSES = {401, 403, 429}
+CREDENTIAL_ERROR_MARKERS = ("API_KEY_INVALID", "API key not valid", "PERMISSION_DENIED", "RESOURCE_EXHAUSTED", "quota")
+
+
+class NoHealthyCredentialError(RuntimeError):
+    pass
+
+
+@dataclass
+class Credential:
+    key: str
+    limiter: AsyncLimiter
+    daily_quota: Optional[int] = None
+    in_flight: int = 0
+    used: int = 0
+    failures: int = 0
+    quarantined_until: float = 0.0
+    day: int = field(default_factory=lambda: int(time.time() // 86400))
+
+    @property
+    def label(self) -> str:
+        return f"...{self.key[-4:]}"
+
+    def roll_day(self):
+        today = int(time.time() // 86400)
+        if today != self.day:
+            self.day = today
+            self.used = 0
+
+    def is_healthy(self, now: float) -> bool:
+        self.roll_day()
+        if self.quarantined_until > now:
+            return False
+        return self.daily_quota is None or self.used < self.daily_quota
+
+
+class CredentialPool:
+    def __init__(self, keys: List[str], rate_limit: Tuple[float, float] = (10, 1), daily_quota: Optional[int] = None, quarantine_seconds: float = 300.0):
+        self.credentials = [
+            Credential(key=key, limiter=AsyncLimiter(*rate_limit), daily_quota=daily_quota)
+            for key in dict.fromkeys(k.strip() for k in keys if k and k.strip())
+        ]
+        self.quarantine_seconds = quarantine_seconds
+
+    @classmethod
+    def from_env(cls, name: str, default: Optional[List[str]] = None, **kwargs) -> "CredentialPool":
+        keys = os.environ.get(f"{name}S", "").split(",") + [os.environ.get(name, "")]
+        keys = [k for k in keys if k.strip()] or list(default or [])
+        return cls(keys, **kwargs)
+
+    def __bool__(self) -> bool:
+        return bool(self.credentials)
+
+    def pick(self) -> Optional[Credential]:
+        now = time.time()
+        healthy = [c for c in self.credentials if c.is_healthy(now)]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda c: (c.in_flight, c.used))
+
+    async def wait_for_credential(self) -> Credential:
+        while True:
+            credential = self.pick()
+            if credential:
+                return credential
+            now = time.time()
+            waits = [c.quarantined_until - now for c in self.credentials if c.quarantined_until > now]
+            if not waits:
+                raise NoHealthyCredentialError("All credentials have exhausted their daily quota")
+            await asyncio.sleep(min(waits))
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Credential]:
+        credential = await self.wait_for_credential()
+        credential.in_flight += 1
+        try:
+            async with credential.limiter:
+                credential.used += 1
+                yield credential
+        finally:
+            credential.in_flight -= 1
+
+    def report(self, credential: Credential, error: Optional[BaseException] = None, status: Optional[int] = None):
+        status = status or getattr(error, "code", None) or getattr(error, "status_code", None)
+        message = str(error) if error else ""
+        if status in CREDENTIAL_ERROR_STATUSES or any(marker in message for marker in CREDENTIAL_ERROR_MARKERS):
+            credential.failures += 1
+            credential.quarantined_until = time.time() + self.quarantine_seconds * credential.failures
+        elif error is None and status in (None, 200):
+            credential.failures = 0
+
+    def stats(self) -> List[Dict]:
+        now = time.time()
+        return [
+            {
+                "key": c.label,
+                "in_flight": c.in_flight,
+                "used_today": c.used,
+                "failures": c.failures,
+                "healthy": c.is_healthy(now),
+            }
+            for c in self.credentials
+        ]
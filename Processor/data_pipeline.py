@@ -2,23 +2,52 @@ import asyncio
 import json
 import os
 import random
-import re
+import time
 from pathlib import Path
 from logging import Logger
 from typing import Dict, Optional, Any, List
 from aiolimiter import AsyncLimiter
+from opentelemetry import trace
+from Processor.checkpoint_coordinator import CheckpointCoordinator
 from Processor.checkpoint_processor import ProcessingState
+from Processor.dead_letter import DeadLetterStore
+from Processor.circuit_breaker import CircuitBreaker, CircuitOpenError
+from Processor.distributed import SQLiteWorkQueue
+from Processor.metrics import MetricsRegistry, get_metrics
+from Processor.post_processor import PostProcessor, clean_result, remove_citations
+from Processor.scheduling import PriorityItemQueue
+from Processor.tracing import tagged
+
+
+tracer = trace.get_tracer(__name__)
 
 
 class DataPipeline:
-    def __init__(self, ProcessingState: ProcessingState, logger: Logger, dataset_paths: List[Path], CONFIG: Dict, resume: bool = True):
+    def __init__(self, ProcessingState: ProcessingState, logger: Logger, dataset_paths: List[Path], CONFIG: Dict, resume: bool = True, post_processor: Optional[PostProcessor] = None, breaker: Optional[CircuitBreaker] = None, metrics: Optional[MetricsRegistry] = None):
         self.logger = logger
         self.CONFIG = CONFIG
-        self.queue = asyncio.Queue(maxsize=self.CONFIG["QUEUE_SIZE"])
+        if self.CONFIG.get("PRIORITY_SCHEDULING"):
+            self.queue = PriorityItemQueue(
+                maxsize=self.CONFIG["QUEUE_SIZE"],
+                scorer=self.CONFIG.get("PRIORITY_SCORER"),
+                aging=self.CONFIG.get("PRIORITY_AGING", 0.01)
+            )
+        else:
+            self.queue = asyncio.Queue(maxsize=self.CONFIG["QUEUE_SIZE"])
         self.dataset_paths = dataset_paths
         self.state = ProcessingState.load_checkpoint(self.logger, self.CONFIG) if resume else ProcessingState
         self.processing_complete = asyncio.Event()
-        self.results = []
+        self.metrics = metrics or get_metrics()
+        self.checkpointer = CheckpointCoordinator(self.state, self.logger, self.CONFIG, self.metrics)
+        self.post_processor = post_processor
+        self.controller = None
+        self.breaker = breaker
+        self.dead_letters = DeadLetterStore(self.CONFIG["CHECKPOINT_DIR"] / "dead_letters.jsonl", self.CONFIG.get("DLQ_MAX_ATTEMPTS"))
+        self.workers: Dict[int, asyncio.Task] = {}
+        self.next_worker_id = 0
+        self.retire_requests = 0
+        self.consumer_args = ()
+        self.expected_files = 0
 
     async def scan_files(self, file_location: Path) -> List[str]:
         files = [
@@ -31,7 +60,12 @@ class DataPipeline:
         return files
 
     def remove_citations(self, text: str) -> str:
-        return re.sub(r' \[\d+(?:, \d+)*\]', '', text)
+        return remove_citations(text)
+
+    async def post_process(self, result: Any) -> Dict[str, Any]:
+        if self.post_processor:
+            return await self.post_processor.submit(result)
+        return clean_result(result)
 
     async def producer(self, dataset_label: str, file_path: Path):
         try:
@@ -42,6 +76,7 @@ class DataPipeline:
                 return
 
             self.logger.info(f"Found {len(files)} files to process")
+            self.expected_files = len(files) + len(self.state.processed_files)
 
             for f in files:
                 self.state.current_file = f
@@ -53,7 +88,7 @@ class DataPipeline:
                         continue
 
                     key = f"{dataset_label}:{f}"
-                    self.state.total_items = len(data)
+                    self.state.set_file_total(key, len(data))
                     self.state.processed_items.setdefault(key, set())
 
                     if isinstance(data, dict):
@@ -86,77 +121,231 @@ class DataPipeline:
         except Exception as e:
             self.logger.error(f"Producer error: {e}", exc_info=True)
 
-    async def consumer(self, process, worker_id: int, limiter=None, semaphore=None, base_data=None, enriched_data=None):
-        checkpoint_lock = asyncio.Lock()
+    async def replay_producer(self):
+        try:
+            items = await asyncio.to_thread(self.dead_letters.pending)
+            total = len(await asyncio.to_thread(self.dead_letters.load))
+            self.logger.info(f"Replaying {len(items)} dead-lettered items, {total - len(items)} exhausted after {self.dead_letters.max_attempts} attempts")
+            for item in items:
+                await self.queue.put(item)
+        except Exception as e:
+            self.logger.error(f"Replay producer error: {e}", exc_info=True)
+
+    async def distributed_producer(self, dataset_label: str, file_path: Path, work_queue: SQLiteWorkQueue, node_id: str):
+        try:
+            files = sorted(f for f in os.listdir(file_path) if f.endswith(".json"))
+            self.expected_files = len(files)
+            loaded: Dict[str, Any] = {}
+            for f in files:
+                data = await asyncio.to_thread(lambda: json.load((file_path / f).open("r", encoding="utf-8")))
+                if not isinstance(data, dict) and not isinstance(data, list):
+                    self.logger.warning(f"{dataset_label}: Skipping {f} - invalid format")
+                    continue
+                key = f"{dataset_label}:{f}"
+                loaded[key] = (f, list(data.items()) if isinstance(data, dict) else list(enumerate(data)))
+                self.state.set_file_total(key, len(data))
+                await asyncio.to_thread(work_queue.seed, key, len(data), self.CONFIG["LEASE_SIZE"])
+
+            ttl = self.CONFIG["LEASE_TTL"]
+            while True:
+                lease = await asyncio.to_thread(work_queue.lease, node_id, ttl)
+                if lease is None:
+                    self.logger.info(f"[{node_id}] No more ranges to lease")
+                    break
+
+                key, start, end = lease
+                if key not in loaded:
+                    self.logger.warning(f"[{node_id}] Leased unknown range {key}[{start}:{end}], skipping")
+                    continue
+
+                f, entries = loaded[key]
+                self.state.current_file = f
+                self.state.processed_items.setdefault(key, set())
+                self.logger.info(f"[{node_id}] Leased {key}[{start}:{end}]")
+                renewer = asyncio.create_task(self.renew_lease(work_queue, node_id, key, start, ttl))
+                try:
+                    for item_id, item_data in entries[start:end]:
+                        if item_id not in self.state.processed_items[key]:
+                            await self.queue.put({
+                                "dataset": dataset_label,
+                                "file": f,
+                                "id": item_id,
+                                "data": item_data
+                            })
+                    await self.queue.join()
+                    await self.checkpointer.sync()
+                finally:
+                    renewer.cancel()
+                await asyncio.to_thread(work_queue.complete, node_id, key, start)
+
+        except Exception as e:
+            self.logger.error(f"Distributed producer error: {e}", exc_info=True)
+
+    async def renew_lease(self, work_queue: SQLiteWorkQueue, node_id: str, key: str, start: int, ttl: float):
+        while True:
+            await asyncio.sleep(ttl / 3)
+            if not await asyncio.to_thread(work_queue.renew, node_id, key, start, ttl):
+                self.logger.warning(f"[{node_id}] Lost lease on {key}[{start}]")
+                return
+
+    def configure_consumers(self, process, limiter=None, semaphore=None, base_data=None):
+        self.consumer_args = (process, limiter, semaphore, base_data)
+
+    def active_workers(self) -> int:
+        return len(self.workers) - self.retire_requests
+
+    def start_consumer(self) -> int:
+        process, limiter, semaphore, base_data = self.consumer_args
+        worker_id = self.next_worker_id
+        self.next_worker_id += 1
+        task = asyncio.create_task(self.consumer(process, worker_id, limiter, semaphore, base_data))
+        self.workers[worker_id] = task
+        task.add_done_callback(lambda _, w=worker_id: self.workers.pop(w, None))
+        return worker_id
+
+    def scale_consumers(self, target: int):
+        current = self.active_workers()
+        if target > current:
+            cancelled = min(self.retire_requests, target - current)
+            self.retire_requests -= cancelled
+            for _ in range(target - current - cancelled):
+                self.start_consumer()
+        elif target < current:
+            self.retire_requests += current - target
+
+    async def stop_consumers(self):
+        for _ in range(len(self.workers)):
+            await self.queue.put(None)
+        await asyncio.gather(*list(self.workers.values()))
+        self.retire_requests = 0
+
+    async def consumer(self, process, worker_id: int, limiter=None, semaphore=None, base_data=None):
         try:
             while True:
-                item = await self.queue.get()
+                if self.retire_requests > 0:
+                    self.retire_requests -= 1
+                    self.logger.info(f"Worker-{worker_id} retired by concurrency controller")
+                    break
+
+                with self.metrics.timer("queue_wait_seconds"):
+                    item = await self.queue.get()
                 if item is None:
                     self.logger.info(f"Worker-{worker_id} received shutdown signal")
+                    self.queue.task_done()
                     break
 
                 try:
                     dataset = item["dataset"]
                     _file = item["file"]
                     item_id = item["id"]
-                    data = item["data"]
-
-                    if semaphore:
-                        async with semaphore:
-                            result = await self.process_with_limiter(process, dataset, _file, item_id, data, limiter, base_data)
-                    else:
-                        result = await self.process_with_limiter(process, dataset, _file, item_id, data, limiter, base_data)
-
-                    if result:
-                        cleaned_result = {k: (self.remove_citations(v) if isinstance(v, str) else v)
-                                          for k, v in result.items()}
-                        key = f"{dataset}:{_file}"
-                        self.state.processed_items.setdefault(key, set()).add(item_id)
-                        self.state.total_processed += 1
-                        self.results.append(cleaned_result)
 
-                    if self.state.total_processed % self.CONFIG["CHECKPOINT_INTERVAL"] == 0:
-                        async with checkpoint_lock:
-                            await asyncio.to_thread(self.state.save_checkpoint, self.logger, self.CONFIG, self.results, enriched_data)
-                            self.logger.info(f"[Worker-{worker_id}]: Saved {len(self.results)} results to file.")
+                    try:
+                        result = await self.run_item(process, worker_id, item, limiter, semaphore, base_data)
+                    except CircuitOpenError as e:
+                        self.logger.warning(f"[Worker-{worker_id}] Skipping item {item_id}: {e}")
+                        self.metrics.inc("items_total", outcome="circuit_open")
+                        await asyncio.to_thread(self.dead_letters.record, item, e, 0)
+                        continue
 
-                    if self.state.total_processed % 100 == 0:
-                        self.logger.info(f"[Worker-{worker_id}] Total processed so far: {self.state.total_processed}")
+                    self.metrics.inc("items_total", outcome="ok" if result else "empty")
+                    if not result:
+                        self.logger.warning(f"[Worker-{worker_id}] Empty result for item {item_id}")
+                        await asyncio.to_thread(self.dead_letters.record, item, ValueError(f"Empty result: {result!r}"), 1)
+                        continue
+                    with tracer.start_as_current_span("parse", attributes={"stage": "post_process"}), self.metrics.timer("parse_seconds", stage="post_process"):
+                        cleaned_result = await self.post_process(result)
+                    await self.checkpointer.submit(dataset, _file, item_id, cleaned_result)
+                    if await asyncio.to_thread(self.dead_letters.contains, item):
+                        await asyncio.to_thread(self.dead_letters.resolve, item)
 
                 except Exception as e:
-                    self.logger.error(f"Consumer error on item {item.get('id')}: {e}", exc_info=True)
+                    self.logger.error(f"Consumer error on item {item.get('id')}: {e.__class__.__name__}: {e}")
+                    self.metrics.inc("items_total", outcome="failed")
+                    self.metrics.inc("failures_total", error=e.__class__.__name__)
+                    await asyncio.to_thread(self.dead_letters.record, item, e, getattr(e, "attempts", 1))
                 finally:
                     self.queue.task_done()
 
-            async with checkpoint_lock:
-                await asyncio.to_thread(self.state.save_checkpoint, self.logger, self.CONFIG, self.results, enriched_data)
-                self.logger.info(f"[Worker-{worker_id}] Final flush: saved {len(self.results)} remaining results")
-
         except Exception as e:
-            self.logger.error(f"Consumer error on item {item.get('id')}: {e}", exc_info=True)
+            self.logger.error(f"Worker-{worker_id} stopped unexpectedly: {e}", exc_info=True)
+
+    async def run_item(self, process, worker_id: int, item: Dict[str, Any], limiter=None, semaphore=None, base_data=None):
+        company = item["data"].get("name") if isinstance(item["data"], dict) else None
+        with tagged(company=company, dataset=item["dataset"]), tracer.start_as_current_span(
+            "pipeline.item", attributes={"file": item["file"], "item_id": str(item["id"]), "worker": worker_id}
+        ):
+            return await self.run_item_attempts(process, worker_id, item, limiter, semaphore, base_data)
+
+    async def run_item_attempts(self, process, worker_id: int, item: Dict[str, Any], limiter=None, semaphore=None, base_data=None):
+        while True:
+            started = time.monotonic()
+            try:
+                if semaphore:
+                    waited = time.perf_counter()
+                    async with semaphore:
+                        self.metrics.observe("semaphore_wait_seconds", time.perf_counter() - waited)
+                        result = await self.process_with_limiter(process, item["dataset"], item["file"], item["id"], item["data"], limiter, base_data)
+                else:
+                    result = await self.process_with_limiter(process, item["dataset"], item["file"], item["id"], item["data"], limiter, base_data)
+            except CircuitOpenError as e:
+                if self.CONFIG.get("CIRCUIT_OPEN_POLICY", "park") != "park":
+                    raise
+                self.logger.debug(f"[Worker-{worker_id}] Parking item {item['id']} for {e.retry_after:.1f}s")
+                await asyncio.sleep(e.retry_after)
+                continue
+            except Exception:
+                if self.controller:
+                    self.controller.record(time.monotonic() - started, False)
+                raise
+            if self.controller:
+                self.controller.record(time.monotonic() - started, bool(result))
+            self.metrics.observe("item_seconds", time.monotonic() - started)
+            return result
 
     async def process_item(self, process, dataset: str, f: str, item_id: str, data: Dict[str, Any], limiter: Optional[AsyncLimiter] = None, base_data: Dict = {}) -> Optional[Dict[str, Any]]:
         self.logger.debug(f"[{dataset}] Processed item {item_id} from {f}")
-        retVal = await process(self.logger, data, limiter, base_data)
+        retVal = await asyncio.wait_for(process(self.logger, data, limiter, base_data), self.CONFIG.get("ITEM_TIMEOUT"))
         return retVal
 
     async def process_with_limiter(self, process, dataset, _file, item_id, data, rate_limiter, base_data):
-        async def wrapped():
+        async def throttled():
+            with tracer.start_as_current_span("limiter.acquire"), self.metrics.timer("limiter_wait_seconds"):
+                await rate_limiter.acquire()
             return await self.process_item(process, dataset, _file, item_id, data, rate_limiter, base_data)
 
-        async def throttled_retry():
-            async with rate_limiter:
-                return await self.retry_with_backoff(wrapped)
+        async def wrapped():
+            if not self.breaker:
+                return await throttled()
+            self.breaker.check()
+            try:
+                result = await throttled()
+            except asyncio.CancelledError:
+                self.breaker.release()
+                raise
+            except Exception:
+                self.breaker.record_failure()
+                raise
+            if result is None:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            return result
 
-        return await throttled_retry()
+        return await self.retry_with_backoff(wrapped)
 
-    async def retry_with_backoff(self, coro, retries=3, base_delay=0.5):
+    async def retry_with_backoff(self, coro, retries=None, base_delay=0.5):
+        retries = retries or self.CONFIG.get("RETRIES", 3)
         for attempt in range(retries):
             try:
-                return await coro()
+                with tracer.start_as_current_span("retry.attempt", attributes={"attempt": attempt + 1}):
+                    return await coro()
+            except CircuitOpenError:
+                raise
             except Exception as e:
                 if attempt == retries - 1:
+                    e.attempts = retries
                     raise
                 delay = base_delay * (2 ** attempt) + random.uniform(0, 0.1)
+                self.metrics.inc("retries_total", error=e.__class__.__name__)
                 self.logger.warning(f"[Retry] Attempt {attempt + 1} failed. Retrying in {delay:.2f}s...")
                 await asyncio.sleep(delay)
\ No newline at end of file
@@ -0,0 +1,89 @@
+import datetime
+import json
+from filelock import FileLock
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class DeadLetterStore:
+    def __init__(self, path: Path, max_attempts: Optional[int] = None):
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self.attempts: Optional[Dict[str, int]] = None
+
+    @staticmethod
+    def item_key(item: Dict[str, Any]) -> str:
+        return f"{item['dataset']}:{item['file']}:{item['id']}"
+
+    def append(self, entry: Dict[str, Any]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with FileLock(f"{self.path}.lock"):
+            with open(self.path, "a", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False, default=str)
+                f.write("\n")
+
+    def record(self, item: Dict[str, Any], error: BaseException, attempts: int):
+        key = self.item_key(item)
+        total = max(self.attempt_count(item), item.get("attempts", 0)) + attempts
+        self.attempts[key] = total
+        self.append({
+            "key": key,
+            "item": {k: item[k] for k in ("dataset", "file", "id", "data")},
+            "error_class": error.__class__.__name__,
+            "error": str(error),
+            "attempts": total,
+            "timestamp": datetime.datetime.now().isoformat()
+        })
+
+    def resolve(self, item: Dict[str, Any]):
+        if self.attempts is not None:
+            self.attempts.pop(self.item_key(item), None)
+        self.append({
+            "key": self.item_key(item),
+            "resolved": True,
+            "timestamp": datetime.datetime.now().isoformat()
+        })
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        entries: Dict[str, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return entries
+        with FileLock(f"{self.path}.lock"):
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    if entry.get("resolved"):
+                        entries.pop(entry["key"], None)
+                    else:
+                        entries[entry["key"]] = entry
+        return entries
+
+    def attempt_count(self, item: Dict[str, Any]) -> int:
+        if self.attempts is None:
+            self.attempts = {key: entry["attempts"] for key, entry in self.load().items()}
+        return self.attempts.get(self.item_key(item), 0)
+
+    def contains(self, item: Dict[str, Any]) -> bool:
+        self.attempt_count(item)
+        return self.item_key(item) in self.attempts
+
+    def exhausted(self, entry: Dict[str, Any]) -> bool:
+        return bool(self.max_attempts) and entry["attempts"] >= self.max_attempts
+
+    def pending(self) -> List[Dict[str, Any]]:
+        return [
+            dict(entry["item"], attempts=entry["attempts"], replay=True)
+            for entry in self.load().values() if not self.exhausted(entry)
+        ]
+
+    def compact(self):
+        entries = self.load()
+        with FileLock(f"{self.path}.lock"):
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for entry in entries.values():
+                    json.dump(entry, f, ensure_ascii=False, default=str)
+                    f.write("\n")
+            tmp.replace(self.path)
@@ -0,0 +1,150 @@
+import json
+import sqlite3
+import sys
+import time
+from contextlib import closing
+from filelock import FileLock
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+
+class SQLiteWorkQueue:
+    def __init__(self, path: Path, timeout: float = 30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        with closing(self.connect()) as conn, conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    key TEXT NOT NULL,
+                    start INTEGER NOT NULL,
+                    end INTEGER NOT NULL,
+                    owner TEXT,
+                    expires_at REAL NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    PRIMARY KEY (key, start)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS merges (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    owner TEXT NOT NULL,
+                    merged_at REAL NOT NULL
+                )
+            """)
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def seed(self, key: str, total: int, range_size: int):
+        with closing(self.connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            added = conn.executemany(
+                "INSERT OR IGNORE INTO leases (key, start, end) VALUES (?, ?, ?)",
+                [(key, start, min(start + range_size, total)) for start in range(0, total, range_size)]
+            ).rowcount
+            if added:
+                conn.execute("DELETE FROM merges")
+            conn.execute("COMMIT")
+
+    def lease(self, owner: str, ttl: float) -> Optional[Tuple[str, int, int]]:
+        now = time.time()
+        with closing(self.connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                """
+                SELECT key, start, end FROM leases
+                WHERE status = 'pending' OR (status = 'leased' AND expires_at < ?)
+                ORDER BY key, start LIMIT 1
+                """,
+                (now,)
+            ).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE leases SET owner = ?, expires_at = ?, status = 'leased' WHERE key = ? AND start = ?",
+                    (owner, now + ttl, row[0], row[1])
+                )
+            conn.execute("COMMIT")
+        return row
+
+    def renew(self, owner: str, key: str, start: int, ttl: float) -> bool:
+        with closing(self.connect()) as conn:
+            cur = conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE key = ? AND start = ? AND owner = ? AND status = 'leased'",
+                (time.time() + ttl, key, start, owner)
+            )
+            return cur.rowcount == 1
+
+    def complete(self, owner: str, key: str, start: int) -> bool:
+        with closing(self.connect()) as conn:
+            cur = conn.execute(
+                "UPDATE leases SET status = 'done' WHERE key = ? AND start = ? AND owner = ?",
+                (key, start, owner)
+            )
+            return cur.rowcount == 1
+
+    def progress(self) -> Dict[str, int]:
+        with closing(self.connect()) as conn:
+            rows = conn.execute("SELECT status, COUNT(*) FROM leases GROUP BY status").fetchall()
+        return dict(rows)
+
+    def all_complete(self) -> bool:
+        counts = self.progress()
+        return bool(counts) and set(counts) == {"done"}
+
+    def claim_merge(self, owner: str) -> bool:
+        with closing(self.connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            pending = conn.execute("SELECT COUNT(*) FROM leases WHERE status != 'done'").fetchone()[0]
+            claimed = False
+            if not pending:
+                cur = conn.execute(
+                    "INSERT OR IGNORE INTO merges (id, owner, merged_at) VALUES (1, ?, ?)",
+                    (owner, time.time())
+                )
+                claimed = cur.rowcount == 1
+            conn.execute("COMMIT")
+        return claimed
+
+    def merge_owner(self) -> Optional[str]:
+        with closing(self.connect()) as conn:
+            row = conn.execute("SELECT owner FROM merges WHERE id = 1").fetchone()
+        return row[0] if row else None
+
+
+def shard_path(path: Path, node_id: str) -> Path:
+    return path.with_name(f"{path.stem}.{node_id}{path.suffix}")
+
+
+def merge_shards(shards: List[Path], output: Path, key: str = "company_name") -> int:
+    merged: Dict[str, Dict] = {}
+    unkeyed: List[Dict] = []
+    for shard in shards:
+        with FileLock(f"{shard}.lock"):
+            with open(shard, "r", encoding="utf-8") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    for record in json.loads(line):
+                        if record.get(key):
+                            merged[record[key]] = record
+                        else:
+                            unkeyed.append(record)
+    records = list(merged.values()) + unkeyed
+    with FileLock(f"{output}.lock"):
+        tmp = output.with_suffix(output.suffix + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(records, f, ensure_ascii=False)
+            f.write("\n")
+        tmp.replace(output)
+    return len(records)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: python -m Processor.distributed <output> <shard> [<shard> ...]")
+        sys.exit(1)
+    count = merge_shards([Path(p) for p in sys.argv[2:]], Path(sys.argv[1]))
+    print(f"Merged {count} records into {sys.argv[1]}")
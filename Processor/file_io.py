@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Any, List, Union
+
+import aiofiles
+import aiofiles.os
+
+
+PathLike = Union[str, Path]
+
+
+async def read_text(path: PathLike) -> str:
+    async with aiofiles.open(path, "r", encoding="utf-8") as f:
+        return await f.read()
+
+
+async def write_text(path: PathLike, text: str):
+    path = Path(path)
+    tmp = path.with_name(f"{path.name}.tmp")
+    async with aiofiles.open(tmp, "w", encoding="utf-8") as f:
+        await f.write(text)
+    await aiofiles.os.replace(tmp, path)
+
+
+async def read_json(path: PathLike) -> Any:
+    return await asyncio.to_thread(json.loads, await read_text(path))
+
+
+async def write_json(path: PathLike, data: Any, **dump_kwargs):
+    text = await asyncio.to_thread(json.dumps, data, **dump_kwargs)
+    await write_text(path, text)
+
+
+def load_jsonl(path: PathLike) -> List[Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [part for line in f if line.strip() for part in json.loads(line)]
+
+
+def append_to_json_array(path: PathLike, item: Any, indent: int = 4):
+    encoded = json.dumps(item, indent=indent, ensure_ascii=False)
+    encoded = "\n".join(" " * indent + line for line in encoded.splitlines())
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"[\n{encoded}\n]")
+        return
+
+    with open(path, "rb+") as f:
+        f.seek(0, os.SEEK_END)
+        tail_start = max(0, f.tell() - 4096)
+        f.seek(tail_start)
+        tail = f.read().rstrip()
+        if not tail.endswith(b"]"):
+            f.close()
+            rewrite_as_array(path, item, indent)
+            return
+        body = tail[:-1].rstrip()
+        empty = body.endswith(b"[")
+        f.seek(tail_start + len(body))
+        f.truncate()
+        f.write((("\n" if empty else ",\n") + encoded + "\n]").encode("utf-8"))
+
+
+def rewrite_as_array(path: PathLike, item: Any, indent: int = 4):
+    with open(path, "r", encoding="utf-8") as f:
+        try:
+            existing = json.load(f)
+        except json.JSONDecodeError:
+            existing = []
+    if not isinstance(existing, list):
+        existing = [existing]
+    existing.append(item)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(existing, f, indent=indent, ensure_ascii=False)
+
+
+async def append_json_array(path: PathLike, item: Any, indent: int = 4):
+    await asyncio.to_thread(append_to_json_array, path, item, indent)
+
+
+async def rename(src: PathLike, dst: PathLike):
+    await aiofiles.os.rename(src, dst)
+
+
+async def exists(path: PathLike) -> bool:
+    return await aiofiles.os.path.exists(path)
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    def __init__(self, size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, latency: float):
+        self.samples.append(latency)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Hedger:
+    def __init__(self, stage_timeouts: Optional[Dict[str, float]] = None, default_timeout: Optional[float] = None,
+                 hedge: bool = False, hedge_quantile: float = 0.95, min_samples: int = 20):
+        self.stage_timeouts = stage_timeouts or {}
+        self.default_timeout = default_timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.min_samples = min_samples
+        self.trackers: Dict[str, LatencyTracker] = defaultdict(LatencyTracker)
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    @classmethod
+    def from_config(cls, CONFIG: Dict) -> "Hedger":
+        return cls(
+            stage_timeouts=CONFIG.get("STAGE_TIMEOUTS"),
+            default_timeout=CONFIG.get("REQUEST_TIMEOUT"),
+            hedge=CONFIG.get("HEDGE_REQUESTS", False),
+        )
+
+    def hedge_delay(self, stage: str) -> Optional[float]:
+        tracker = self.trackers[stage]
+        if not self.hedge or len(tracker.samples) < self.min_samples:
+            return None
+        return tracker.percentile(self.hedge_quantile)
+
+    async def call(self, stage: str, factory: Callable[[], Awaitable[T]]) -> T:
+        timeout = self.stage_timeouts.get(stage, self.default_timeout)
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(self.race(stage, factory), timeout)
+        except asyncio.TimeoutError:
+            self.counters[f"{stage}.timeouts"] += 1
+            raise
+        self.trackers[stage].add(time.monotonic() - started)
+        return result
+
+    async def race(self, stage: str, factory: Callable[[], Awaitable[T]]) -> T:
+        primary = asyncio.ensure_future(factory())
+        tasks = {primary}
+        try:
+            delay = self.hedge_delay(stage)
+            if delay is None:
+                return await primary
+
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+
+            self.counters[f"{stage}.hedges_issued"] += 1
+            hedge = asyncio.ensure_future(factory())
+            tasks.add(hedge)
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                winners = [task for task in done if task.exception() is None]
+                if winners or not tasks:
+                    winner = (winners or list(done))[0]
+                    if winner is hedge and winners:
+                        self.counters[f"{stage}.hedges_won"] += 1
+                    return winner.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def stats(self) -> Dict:
+        return {
+            "counters": dict(self.counters),
+            "p95": {stage: tracker.percentile(0.95) for stage, tracker in self.trackers.items()},
+        }
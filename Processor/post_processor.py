@@ -0,0 +1,107 @@
+import asyncio
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+def remove_citations(text: str) -> str:
+    return re.sub(r' \[\d+(?:, \d+)*\]', '', text)
+
+
+def clean_result(result: Any, parser: Optional[Callable] = None, validator: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None,
+                 anonymize: bool = False) -> Dict[str, Any]:
+    if isinstance(result, str):
+        if parser is None:
+            raise ValueError("Received a raw response but no parser is configured")
+        result = parser(result)
+    if not isinstance(result, dict):
+        raise ValueError(f"Expected a JSON object, got {result.__class__.__name__}")
+    cleaned = {k: (remove_citations(v) if isinstance(v, str) else v) for k, v in result.items()}
+    if validator is not None:
+        cleaned = validator(cleaned)
+    if anonymize:
+        from company_anonimizer import SpaCyJsonAnonymizer
+        cleaned = SpaCyJsonAnonymizer(irreversible=True).anonymize(cleaned)
+    return cleaned
+
+
+def clean_batch(results: List[Any], parser: Optional[Callable] = None, validator: Optional[Callable] = None, anonymize: bool = False) -> List[Tuple[bool, Any]]:
+    out = []
+    for result in results:
+        try:
+            out.append((True, clean_result(result, parser, validator, anonymize)))
+        except Exception as e:
+            out.append((False, e))
+    return out
+
+
+class PostProcessor:
+    def __init__(self, workers: int, batch_size: int = 16, max_pending: int = 256, batch_delay: float = 0.05,
+                 parser: Optional[Callable] = None, validator: Optional[Callable] = None, anonymize: bool = False):
+        self.executor = ProcessPoolExecutor(max_workers=workers) if workers else None
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.slots = asyncio.Semaphore(max_pending)
+        self.clean_one = partial(clean_result, parser=parser, validator=validator, anonymize=anonymize)
+        self.clean = partial(clean_batch, parser=parser, validator=validator, anonymize=anonymize)
+        self.batch: List[Tuple[Any, asyncio.Future]] = []
+        self.timer: Optional[asyncio.TimerHandle] = None
+        self.running: set = set()
+
+    @classmethod
+    def from_config(cls, CONFIG: Dict, **kwargs) -> "PostProcessor":
+        kwargs.setdefault("anonymize", CONFIG.get("POST_PROCESS_ANONYMIZE", False))
+        return cls(
+            CONFIG.get("POST_PROCESS_WORKERS", 0),
+            batch_size=CONFIG.get("POST_PROCESS_BATCH_SIZE", 16),
+            max_pending=CONFIG.get("POST_PROCESS_MAX_PENDING", 256),
+            **kwargs
+        )
+
+    async def submit(self, result: Any) -> Dict[str, Any]:
+        if self.executor is None:
+            return self.clean_one(result)
+        await self.slots.acquire()
+        try:
+            future = asyncio.get_running_loop().create_future()
+            self.batch.append((result, future))
+            if len(self.batch) >= self.batch_size:
+                self.dispatch()
+            elif self.timer is None:
+                self.timer = asyncio.get_running_loop().call_later(self.batch_delay, self.dispatch)
+            return await future
+        finally:
+            self.slots.release()
+
+    def dispatch(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.batch:
+            return
+        batch, self.batch = self.batch, []
+        task = asyncio.create_task(self.run_batch(batch))
+        self.running.add(task)
+        task.add_done_callback(self.running.discard)
+
+    async def run_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        loop = asyncio.get_running_loop()
+        try:
+            outcomes = await loop.run_in_executor(self.executor, self.clean, [r for r, _ in batch])
+        except Exception as e:
+            outcomes = [(False, e)] * len(batch)
+        for (_, future), (ok, value) in zip(batch, outcomes):
+            if future.done():
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+    async def close(self):
+        self.dispatch()
+        if self.running:
+            await asyncio.gather(*self.running, return_exceptions=True)
+        if self.executor is not None:
+            await asyncio.to_thread(self.executor.shutdown)
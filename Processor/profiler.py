@@ -0,0 +1,158 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from logging import Logger
+from pathlib import Path
+from types import FrameType
+from typing import Dict, List, Optional
+
+from Processor.metrics import get_metrics
+
+
+def frame_label(frame: FrameType, line: bool = False) -> str:
+    code = frame.f_code
+    lineno = frame.f_lineno if line else code.co_firstlineno
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{lineno})"
+
+
+def thread_stack(frame: Optional[FrameType], line: bool = False) -> List[str]:
+    stack = []
+    while frame is not None:
+        stack.append(frame_label(frame, line))
+        frame = frame.f_back
+    return stack[::-1]
+
+
+def task_stack(task: asyncio.Task) -> List[str]:
+    stack = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        stack.append(frame_label(frame))
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return stack
+
+
+class SlowCallbackCounter(logging.Handler):
+    def emit(self, record: logging.LogRecord):
+        if record.getMessage().startswith("Executing "):
+            get_metrics().inc("slow_callbacks_total")
+
+
+def watch_slow_callbacks(loop: asyncio.AbstractEventLoop, threshold_ms: float):
+    loop.set_debug(True)
+    loop.slow_callback_duration = threshold_ms / 1000
+    asyncio_logger = logging.getLogger("asyncio")
+    if not any(isinstance(h, SlowCallbackCounter) for h in asyncio_logger.handlers):
+        asyncio_logger.addHandler(SlowCallbackCounter())
+
+
+class LoopProfiler:
+    def __init__(self, logger: Logger, output_dir: Path, sample_interval: float = 0.01,
+                 task_interval: float = 1.0, blocking_threshold: float = 0.1):
+        self.logger = logger
+        self.output_dir = Path(output_dir)
+        self.sample_interval = sample_interval
+        self.task_interval = task_interval
+        self.blocking_threshold = blocking_threshold
+        self.heartbeat_interval = min(0.05, blocking_threshold / 4)
+        self.cpu_stacks: Counter = Counter()
+        self.task_stacks: Counter = Counter()
+        self.blocking: List[Dict] = []
+        self.max_lag = 0.0
+        self.heartbeat = time.perf_counter()
+        self.loop_thread: Optional[int] = None
+        self.stopped = threading.Event()
+        self.sampler: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, CONFIG: Dict, logger: Logger) -> "LoopProfiler":
+        return cls(
+            logger,
+            CONFIG.get("PROFILE_DIR", CONFIG["CHECKPOINT_DIR"] / "profile"),
+            sample_interval=CONFIG.get("PROFILE_INTERVAL", 0.01),
+            task_interval=CONFIG.get("TASK_SAMPLE_INTERVAL", 1.0),
+            blocking_threshold=CONFIG.get("BLOCKING_THRESHOLD", 0.1),
+        )
+
+    def sample_thread(self):
+        block_started = None
+        block_stack: List[str] = []
+        while not self.stopped.wait(self.sample_interval):
+            frame = sys._current_frames().get(self.loop_thread)
+            if frame is None:
+                continue
+            self.cpu_stacks[";".join(thread_stack(frame))] += 1
+            stalled = time.perf_counter() - self.heartbeat
+            if stalled > self.blocking_threshold and block_started is None:
+                block_started = self.heartbeat
+                block_stack = thread_stack(frame, line=True)
+            elif stalled <= self.blocking_threshold and block_started is not None:
+                self.record_block(self.heartbeat - block_started, block_stack)
+                block_started = None
+
+    def record_block(self, duration: float, stack: List[str]):
+        event = {"time": time.time(), "duration_ms": round(duration * 1000, 1), "stack": stack}
+        self.blocking.append(event)
+        self.logger.warning(f"[Profiler] Event loop blocked for {event['duration_ms']}ms in {' <- '.join(stack[::-1][:4])}")
+
+    async def watch_loop(self):
+        metrics = get_metrics()
+        next_task_sample = time.perf_counter()
+        while True:
+            expected = time.perf_counter() + self.heartbeat_interval
+            await asyncio.sleep(self.heartbeat_interval)
+            now = time.perf_counter()
+            self.heartbeat = now
+            lag = max(0.0, now - expected)
+            self.max_lag = max(self.max_lag, lag)
+            metrics.observe("loop_lag_seconds", lag)
+            if now >= next_task_sample:
+                next_task_sample = now + self.task_interval
+                current = asyncio.current_task()
+                for task in asyncio.all_tasks():
+                    if task is not current:
+                        self.task_stacks[";".join(task_stack(task))] += 1
+
+    def write(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        for name, stacks in (("cpu.collapsed", self.cpu_stacks), ("tasks.collapsed", self.task_stacks)):
+            with open(self.output_dir / name, "w", encoding="utf-8") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+        with open(self.output_dir / "blocking.jsonl", "w", encoding="utf-8") as f:
+            for event in self.blocking:
+                f.write(json.dumps(event) + "\n")
+
+    def summary(self) -> str:
+        leaves = Counter()
+        for stack, count in self.cpu_stacks.items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        hot = ", ".join(f"{leaf} x{count}" for leaf, count in leaves.most_common(5))
+        return (
+            f"[Profiler] {sum(self.cpu_stacks.values())} samples, max loop lag {self.max_lag * 1000:.1f}ms, "
+            f"{len(self.blocking)} blocking calls over {self.blocking_threshold * 1000:.0f}ms. Hot frames: {hot}"
+        )
+
+    async def run(self, coro):
+        self.loop_thread = threading.get_ident()
+        self.heartbeat = time.perf_counter()
+        self.sampler = threading.Thread(target=self.sample_thread, name="loop-profiler", daemon=True)
+        self.sampler.start()
+        watcher = asyncio.create_task(self.watch_loop(), name="loop-profiler")
+        try:
+            return await coro
+        finally:
+            watcher.cancel()
+            self.stopped.set()
+            self.sampler.join()
+            await asyncio.to_thread(self.write)
+            self.logger.info(self.summary())
+            self.logger.info(f"[Profiler] Wrote collapsed stacks and blocking report to {self.output_dir}")
@@ -0,0 +1,147 @@
+import asyncio
+import sys
+import time
+from collections import deque
+from logging import Logger
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "unknown"
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+class ProgressTracker:
+    def __init__(self, pipeline, logger: Logger, window: float = 300.0):
+        self.pipeline = pipeline
+        self.logger = logger
+        self.window = window
+        self.samples: Deque[Tuple[float, int, float, float]] = deque()
+        self.baseline = pipeline.state.total_processed
+        self.failed_baseline = pipeline.metrics.count("items_total", outcome="failed")
+        self.started = time.monotonic()
+
+    @classmethod
+    def from_config(cls, pipeline, logger: Logger, CONFIG: Dict) -> "ProgressTracker":
+        return cls(pipeline, logger, window=CONFIG.get("PROGRESS_WINDOW", 300.0))
+
+    def sample(self):
+        now = time.monotonic()
+        metrics = self.pipeline.metrics
+        self.samples.append((
+            now,
+            self.pipeline.state.total_processed,
+            metrics.count("items_total"),
+            metrics.count("items_total", outcome="failed")
+        ))
+        while len(self.samples) > 2 and self.samples[0][0] < now - self.window:
+            self.samples.popleft()
+
+    def items_per_minute(self) -> Optional[float]:
+        if len(self.samples) < 2:
+            return None
+        first, last = self.samples[0], self.samples[-1]
+        elapsed = last[0] - first[0]
+        return (last[1] - first[1]) / elapsed * 60 if elapsed > 0 else None
+
+    def error_rate(self) -> Optional[float]:
+        if len(self.samples) < 2:
+            return None
+        first, last = self.samples[0], self.samples[-1]
+        attempted = last[2] - first[2]
+        return (last[3] - first[3]) / attempted if attempted else None
+
+    def estimated_total(self) -> int:
+        totals = self.pipeline.state.file_totals
+        known = sum(totals.values())
+        unseen = max(0, self.pipeline.expected_files - len(totals))
+        if unseen and totals:
+            known += unseen * known / len(totals)
+        return int(known)
+
+    def files(self) -> List[Dict]:
+        state = self.pipeline.state
+        return [
+            {"file": key, "processed": len(state.processed_items.get(key, ())), "total": total}
+            for key, total in state.file_totals.items()
+        ]
+
+    def snapshot(self) -> Dict:
+        self.sample()
+        state = self.pipeline.state
+        total = self.estimated_total()
+        rate = self.items_per_minute()
+        failed = self.pipeline.metrics.count("items_total", outcome="failed") - self.failed_baseline
+        remaining = max(0, total - state.total_processed - failed)
+        eta = remaining / rate * 60 if rate else None
+        breaker = self.pipeline.breaker
+        return {
+            "processed": state.total_processed,
+            "processed_this_run": state.total_processed - self.baseline,
+            "total": total,
+            "percent": state.total_processed / total * 100 if total else None,
+            "items_per_min": rate,
+            "eta_seconds": eta,
+            "elapsed_seconds": time.monotonic() - self.started,
+            "workers": self.pipeline.active_workers(),
+            "queue_depth": self.pipeline.queue.qsize(),
+            "error_rate": self.error_rate(),
+            "failed": failed,
+            "breaker": breaker.state if breaker else None,
+            "current_file": state.current_file,
+            "files": self.files(),
+        }
+
+    def summary(self, snapshot: Dict) -> str:
+        percent = f"{snapshot['percent']:.1f}%" if snapshot["percent"] is not None else "?"
+        rate = f"{snapshot['items_per_min']:.1f}/min" if snapshot["items_per_min"] is not None else "?/min"
+        errors = f"{snapshot['error_rate']:.1%}" if snapshot["error_rate"] is not None else "-"
+        return (
+            f"[Progress] {snapshot['processed']}/{snapshot['total']} ({percent}) {rate} "
+            f"ETA {format_duration(snapshot['eta_seconds'])} | workers {snapshot['workers']} "
+            f"queue {snapshot['queue_depth']} errors {errors}"
+        )
+
+    def render(self, snapshot: Dict) -> str:
+        lines = [self.summary(snapshot), f"Elapsed {format_duration(snapshot['elapsed_seconds'])}, breaker {snapshot['breaker'] or 'off'}"]
+        for entry in snapshot["files"]:
+            done = entry["processed"] / entry["total"] if entry["total"] else 1.0
+            bar = "#" * int(done * 30)
+            marker = "*" if entry["file"].endswith(f":{snapshot['current_file']}") else " "
+            lines.append(f"{marker} {entry['file']:<40} [{bar:<30}] {entry['processed']}/{entry['total']}")
+        return "\n".join(lines)
+
+    async def run(self, interval: float = 30.0, terminal: bool = False):
+        stream = sys.stderr
+        while True:
+            await asyncio.sleep(interval)
+            snapshot = self.snapshot()
+            if terminal and stream.isatty():
+                stream.write("\x1b[2J\x1b[H" + self.render(snapshot) + "\n")
+                stream.flush()
+            else:
+                self.logger.info(self.summary(snapshot))
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 9109):
+        from aiohttp import web
+
+        async def text(request: web.Request) -> web.Response:
+            return web.Response(text=self.render(self.snapshot()) + "\n", content_type="text/plain", charset="utf-8")
+
+        async def progress(request: web.Request) -> web.Response:
+            return web.json_response(self.snapshot())
+
+        app = web.Application()
+        app.router.add_get("/", text)
+        app.router.add_get("/progress", progress)
+        app_runner = web.AppRunner(app)
+        await app_runner.setup()
+        await web.TCPSite(app_runner, host, port).start()
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await app_runner.cleanup()
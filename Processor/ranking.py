@@ -0,0 +1,160 @@
+import argparse
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from Processor.result_store import ResultStore
+from Processor.sqlite_store import SQLiteStore
+
+
+WEIGHTS = {"uniqueness_score": 0.5, "effectiveness_score": 0.3, "market_diff_score": 0.2}
+SCORE_COLUMNS = [*WEIGHTS, "combined_score"]
+COLUMNS = ["company_name", "relevance", "confidence", "action", "known_development_stage", *SCORE_COLUMNS]
+
+DOMAIN_COLUMNS = ["brief_description", "technologies", "core_technology_used"]
+RATIONALE_COLUMNS = ["uniqueness_why", "explanation"]
+
+CROWDED_DOMAINS = {
+    "autonomous_driving": (("autonomous driving", "self-driving", "self driving", "full-stack autonomy", "full stack autonomy"), 3),
+    "ev_charging": (("ev charging", "charging platform", "charging network", "charging station"), 3),
+    "warehouse_robotics": (("warehouse robot", "warehouse automation robot"), 3),
+    "driver_monitoring": (("driver monitoring", "(dms)", " dms ", " dms,", " dms."), 3),
+    "water_from_air": (("water-from-air", "water from air", "atmospheric water"), 3),
+}
+NEGATIVE_OVERRIDES = {
+    "unclear_advantage": (("unclear advantage", "too many players", "used to be unique"), 4),
+    "crowded_market": (("similar players", "crowded"), 3),
+}
+BREAKTHROUGH = ("breakthrough", "first-of-kind", "first of kind", "first-of-its-kind", "first of its kind", "novel", "never done before")
+RULE_COLUMNS = (
+    [f"crowded_{name}" for name in CROWDED_DOMAINS] + [f"override_{name}" for name in NEGATIVE_OVERRIDES]
+    + ["wow_is_none", "wow_breakthrough"]
+)
+VIOLATIONS = ["score_mismatch", "uniqueness_over_cap", "low_confidence_over_cap", "wow_should_be_none", "wow_missing_breakthrough"]
+
+
+def rule_matches(record: Dict) -> Dict[str, bool]:
+    domain = " " + " ".join(str(record.get(c) or "") for c in DOMAIN_COLUMNS).lower() + " "
+    rationale = " ".join(str(record.get(c) or "") for c in RATIONALE_COLUMNS).lower()
+    wow = str(record.get("wow_one_liner") or "").lower()
+    matched = {f"crowded_{name}": any(p in domain for p in phrases) for name, (phrases, _) in CROWDED_DOMAINS.items()}
+    matched.update({f"override_{name}": any(p in rationale for p in phrases) for name, (phrases, _) in NEGATIVE_OVERRIDES.items()})
+    matched["wow_is_none"] = wow.strip() in ("", "none")
+    matched["wow_breakthrough"] = any(p in wow for p in BREAKTHROUGH)
+    return matched
+
+
+def load_frame(records: Iterable[Dict]) -> pd.DataFrame:
+    frame = pd.DataFrame.from_records(
+        ({**{column: record.get(column) for column in COLUMNS}, **rule_matches(record)} for record in records),
+        columns=COLUMNS + RULE_COLUMNS
+    )
+    for column in SCORE_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    for column in RULE_COLUMNS:
+        frame[column] = frame[column].astype(bool)
+    frame["relevance"] = frame["relevance"].astype(str).str.extract(r"([A-Z]+)", expand=False).astype("category")
+    for column in ("confidence", "action", "known_development_stage"):
+        frame[column] = frame[column].astype("category")
+    return frame
+
+
+def load_results(path: Path, sqlite: bool = False) -> pd.DataFrame:
+    if sqlite:
+        return load_frame(SQLiteStore(path).records())
+    with ResultStore(path) as store:
+        return load_frame(store.records())
+
+
+def half_up(values: np.ndarray) -> np.ndarray:
+    return np.floor(values + 0.5)
+
+
+def expected_combined(frame: pd.DataFrame, prefix: str = "", rounding: Callable = half_up) -> pd.Series:
+    weighted = sum(frame[f"{prefix}{column}"] * weight for column, weight in WEIGHTS.items())
+    return pd.Series(rounding(weighted.to_numpy(dtype=float)), index=frame.index)
+
+
+def apply_rules(frame: pd.DataFrame) -> pd.DataFrame:
+    frame = frame.copy()
+    frame["expected_combined"] = expected_combined(frame)
+    frame["combined_delta"] = frame["combined_score"] - frame["expected_combined"]
+    banker = expected_combined(frame, rounding=np.round)
+    frame["score_mismatch"] = (frame["combined_delta"].ne(0) & frame["combined_score"].ne(banker)) | frame["combined_score"].isna()
+
+    for column in WEIGHTS:
+        frame[f"adjusted_{column}"] = frame[column]
+    cap = pd.Series(np.inf, index=frame.index)
+    for name, (_, limit) in CROWDED_DOMAINS.items():
+        cap = cap.where(~frame[f"crowded_{name}"], np.minimum(cap, limit))
+    for name, (_, limit) in NEGATIVE_OVERRIDES.items():
+        cap = cap.where(~frame[f"override_{name}"], np.minimum(cap, limit))
+    frame["uniqueness_cap"] = cap.replace(np.inf, np.nan)
+    frame["adjusted_uniqueness_score"] = frame["uniqueness_score"].clip(upper=cap)
+
+    low_confidence = frame["confidence"].astype(str).str.lower().eq("low")
+    frame["low_confidence_over_cap"] = low_confidence & (frame[list(WEIGHTS)] > 4).any(axis=1)
+    for column in WEIGHTS:
+        adjusted = frame[f"adjusted_{column}"]
+        frame[f"adjusted_{column}"] = adjusted.where(~low_confidence, adjusted.clip(upper=4))
+
+    frame["wow_should_be_none"] = (frame["uniqueness_score"] <= 4) & ~frame["wow_is_none"]
+    frame["wow_missing_breakthrough"] = (frame["uniqueness_score"] >= 8) & ~frame["wow_breakthrough"]
+    frame["uniqueness_over_cap"] = frame["uniqueness_score"] > frame["uniqueness_cap"]
+
+    frame["adjusted_combined"] = expected_combined(frame, prefix="adjusted_")
+    frame["violations"] = frame[VIOLATIONS].sum(axis=1)
+    return frame
+
+
+def shortlist(frame: pd.DataFrame, relevance: Optional[str] = "INVESTMENT", top: Optional[int] = 50,
+              min_combined: Optional[float] = None, strict: bool = False) -> pd.DataFrame:
+    selected = frame
+    if relevance:
+        selected = selected[selected["relevance"] == relevance]
+    if min_combined is not None:
+        selected = selected[selected["adjusted_combined"] >= min_combined]
+    if strict:
+        selected = selected[selected["violations"] == 0]
+    ranked = selected.sort_values(
+        ["adjusted_combined", "adjusted_uniqueness_score", "adjusted_effectiveness_score"], ascending=False, kind="stable"
+    )
+    return ranked.head(top) if top else ranked
+
+
+def report(frame: pd.DataFrame) -> str:
+    flags = [c for c in frame.columns if c.startswith(("crowded_", "override_"))] + VIOLATIONS
+    lines = [f"{len(frame)} results, {int((frame['violations'] > 0).sum())} with at least one guardrail violation"]
+    lines.extend(f"  {flag:<36}{int(frame[flag].sum()):>8}" for flag in flags)
+    moved = frame["adjusted_combined"].ne(frame["combined_score"]).sum()
+    lines.append(f"  {'combined_score changed after rules':<36}{int(moved):>8}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute scores, apply prompt guardrails and print a ranked shortlist")
+    parser.add_argument("path", type=Path, nargs="?", default=Path("data/GED.json"))
+    parser.add_argument("--sqlite", action="store_true", help="Read results from a SQLite store instead of JSONL")
+    parser.add_argument("--relevance", default="INVESTMENT")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--min-combined", type=float, default=None)
+    parser.add_argument("--strict", action="store_true", help="Drop results with any guardrail violation")
+    parser.add_argument("--output", type=Path, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = load_results(args.path, args.sqlite)
+    loaded = time.perf_counter()
+    scored = apply_rules(results)
+    ranked = shortlist(scored, args.relevance, args.top, args.min_combined, args.strict)
+    print(report(scored))
+    print(f"Loaded in {loaded - start:.2f}s, scored and ranked in {time.perf_counter() - loaded:.2f}s\n")
+    columns = ["company_name", "relevance", "combined_score", "adjusted_combined", "uniqueness_score",
+               "adjusted_uniqueness_score", "violations"]
+    print(ranked[columns].to_string(index=False))
+    if args.output:
+        ranked.to_csv(args.output, index=False)
+        print(f"\nShortlist written to {args.output}")
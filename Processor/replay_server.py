@@ -0,0 +1,71 @@
+import argparse
+from aiohttp import web
+from pathlib import Path
+
+from Processor.backends import BackendError, ReplayBackend
+
+
+STATUS_NAMES = {429: "RESOURCE_EXHAUSTED", 503: "UNAVAILABLE", 404: "NOT_FOUND"}
+
+
+def error_response(e: BackendError) -> web.Response:
+    return web.json_response(
+        {"error": {"code": e.code, "message": str(e), "status": STATUS_NAMES.get(e.code, "UNKNOWN")}},
+        status=e.code
+    )
+
+
+def create_app(backend: ReplayBackend) -> web.Application:
+    async def gemini_generate(request: web.Request) -> web.Response:
+        body = await request.json()
+        prompt = "".join(
+            part.get("text", "")
+            for content in body.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        try:
+            text = await backend.generate("", request.match_info["model"], prompt)
+        except BackendError as e:
+            return error_response(e)
+        return web.json_response({
+            "candidates": [{"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP"}]
+        })
+
+    async def perplexity_completions(request: web.Request) -> web.Response:
+        body = await request.json()
+        prompt = "".join(message.get("content", "") for message in body.get("messages", []))
+        try:
+            text = await backend.generate("", body.get("model", ""), prompt)
+        except BackendError as e:
+            return error_response(e)
+        return web.json_response({"choices": [{"message": {"role": "assistant", "content": text}}]})
+
+    app = web.Application(client_max_size=64 * 1024 * 1024)
+    app.router.add_post("/{version}/models/{model}:generateContent", gemini_generate)
+    app.router.add_post("/chat/completions", perplexity_completions)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve recorded LLM responses for load testing")
+    parser.add_argument("recordings", type=Path)
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-median", type=float, default=1.0)
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    backend = ReplayBackend(
+        args.recordings,
+        latency_median=args.latency_median,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        seed=args.seed,
+    )
+    print(f"Replaying {args.recordings} on http://localhost:{args.port}")
+    print(f"  GEMINI_BASE_URL=http://localhost:{args.port}")
+    print(f"  PERPLEXITY_API_URL=http://localhost:{args.port}/chat/completions")
+    web.run_app(create_app(backend), port=args.port, print=None)
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import random
+import time
+from logging import Logger
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from Processor.file_io import load_jsonl
+
+
+FINGERPRINT_FIELDS = ("name", "relevance", "uniqueness_score")
+
+
+def company_key(name: Any) -> str:
+    return str(name or "").strip().lower()
+
+
+def rescored_records(response: Any) -> List[Dict[str, Any]]:
+    if isinstance(response, list):
+        return [r for r in response if isinstance(r, dict)]
+    if isinstance(response, dict):
+        if "company_name" in response:
+            return [response]
+        for value in response.values():
+            if isinstance(value, list):
+                return rescored_records(value)
+    return []
+
+
+class RescoreCache:
+    def __init__(self, path: Path, logger: Logger, calibration_rate: float = 0.05, seed: Optional[int] = None):
+        self.path = Path(path)
+        self.logger = logger
+        self.calibration_rate = calibration_rate
+        self.random = random.Random(seed)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    @classmethod
+    def from_config(cls, CONFIG: Dict, logger: Logger) -> "RescoreCache":
+        return cls(
+            CONFIG.get("RESCORE_CACHE_PATH") or CONFIG["CHECKPOINT_DIR"] / "rescore_cache.json",
+            logger,
+            calibration_rate=CONFIG.get("RESCORE_CALIBRATION_RATE", 0.05),
+        )
+
+    def load(self) -> "RescoreCache":
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        return self
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def digest(value: Any) -> str:
+        payload = json.dumps(value, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def fingerprint(self, candidate: Dict[str, Any], base: str) -> str:
+        return self.digest([[candidate.get(field) for field in FINGERPRINT_FIELDS], base])
+
+    def current(self, candidates: List[Dict[str, Any]], base_data: Any) -> Dict[str, Dict[str, Any]]:
+        base = self.digest(base_data)
+        current = {}
+        for candidate in candidates:
+            key = company_key(candidate.get("name"))
+            entry = self.entries.get(key)
+            if entry and entry["fingerprint"] == self.fingerprint(candidate, base) and entry.get("result"):
+                current[key] = entry["result"]
+        return current
+
+    def plan(self, candidates: List[Dict[str, Any]], base_data: Any) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        current = self.current(candidates, base_data)
+        changed = [c for c in candidates if company_key(c.get("name")) not in current]
+        unchanged = [c for c in candidates if company_key(c.get("name")) in current]
+
+        sample_size = min(len(unchanged), max(1, round(len(unchanged) * self.calibration_rate))) if unchanged and self.calibration_rate else 0
+        calibration = self.random.sample(unchanged, sample_size)
+        sampled = {id(c) for c in calibration}
+        reused = [current[company_key(c.get("name"))] for c in unchanged if id(c) not in sampled]
+        self.logger.info(
+            f"[Stage two] {len(changed)} new or changed candidates, {len(calibration)} calibration samples, "
+            f"{len(reused)} reused from previous run"
+        )
+        return changed, calibration, reused
+
+    def update(self, candidates: List[Dict[str, Any]], base_data: Any, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        base = self.digest(base_data)
+        by_name = {company_key(r.get("company_name")): r for r in results}
+        drifted = calibrated = 0
+        for candidate in candidates:
+            key = company_key(candidate.get("name"))
+            result = by_name.get(key)
+            if result is None:
+                continue
+            previous = self.entries.get(key)
+            if previous and previous["fingerprint"] == self.fingerprint(candidate, base):
+                calibrated += 1
+                drifted += previous["result"].get("uniqueness_score") != result.get("uniqueness_score")
+            self.entries[key] = {"fingerprint": self.fingerprint(candidate, base), "result": result}
+        if calibrated:
+            self.logger.info(f"[Stage two] Calibration drift: {drifted}/{calibrated} unchanged candidates re-scored differently")
+        missing = len(candidates) - sum(1 for c in candidates if company_key(c.get("name")) in by_name)
+        if missing:
+            self.logger.warning(f"[Stage two] {missing} submitted candidates missing from the re-score response")
+        return results
+
+    def fold(self, sink: Path, base_data: Any) -> int:
+        if not sink.exists():
+            return 0
+        base = self.digest(base_data)
+        batches = [r for r in load_jsonl(sink) if isinstance(r, dict) and r.get("base") == base]
+        candidates = [c for batch in batches for c in batch.get("candidates", [])]
+        results = [r for batch in batches for r in batch.get("companies", [])]
+        self.update(candidates, base_data, results)
+        self.save()
+        sink.unlink()
+        self.logger.info(f"[Stage two] Folded {len(results)} re-scored companies from {len(batches)} checkpointed batches")
+        return len(results)
+
+
+def write_batches(input_dir: Path, candidates: List[Dict[str, Any]], base_data: Any, batch_size: int) -> Path:
+    input_dir.mkdir(parents=True, exist_ok=True)
+    base = RescoreCache.digest(base_data)
+    batches = [
+        {"batch": i // batch_size, "base": base, "companies": candidates[i:i + batch_size]}
+        for i in range(0, len(candidates), batch_size)
+    ]
+    path = input_dir / f"rescore-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(batches, f, ensure_ascii=False)
+    return path
+
+
+def merge_rescored(store, rescored: Dict[str, Dict[str, Any]], output: Path, batch_size: int = 10) -> Tuple[int, int]:
+    total = merged = 0
+    tmp = output.with_name(f"{output.name}.tmp")
+    batch: List[Dict[str, Any]] = []
+    with store, open(tmp, "w", encoding="utf-8") as f:
+        for record in store.records():
+            result = rescored.get(company_key(record.get("company_name")))
+            if result:
+                record = {
+                    **record,
+                    "stage_one_relevance": record.get("relevance"),
+                    "stage_one_uniqueness_score": record.get("uniqueness_score"),
+                    "relevance": result.get("relevance", record.get("relevance")),
+                    "uniqueness_score": result.get("uniqueness_score", record.get("uniqueness_score")),
+                }
+                merged += 1
+            batch.append(record)
+            total += 1
+            if len(batch) == batch_size:
+                f.write(json.dumps(batch, ensure_ascii=False) + "\n")
+                batch = []
+        if batch:
+            f.write(json.dumps(batch, ensure_ascii=False) + "\n")
+    os.replace(tmp, output)
+    return total, merged
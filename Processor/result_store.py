@@ -0,0 +1,205 @@
+import hashlib
+import json
+import mmap
+import os
+from filelock import FileLock
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+
+
+HOT_FIELDS = (
+    "company_name", "relevance", "uniqueness_score", "combined_score",
+    "effectiveness_score", "market_diff_score", "confidence", "in_scope", "action"
+)
+SIGNATURE_BYTES = 1 << 16
+
+
+class IndexEntry(NamedTuple):
+    offset: int
+    length: int
+    position: int
+    company_name: Optional[str]
+    relevance: Optional[str]
+    uniqueness_score: Any
+    combined_score: Any
+    effectiveness_score: Any
+    market_diff_score: Any
+    confidence: Optional[str]
+    in_scope: Optional[str]
+    action: Optional[str]
+
+
+def line_records(line: bytes) -> List[Dict[str, Any]]:
+    parsed = json.loads(line)
+    if isinstance(parsed, dict):
+        return [parsed]
+    return [r for r in parsed if isinstance(r, dict)] if isinstance(parsed, list) else []
+
+
+def score_at_least(value: Any, minimum: float) -> bool:
+    try:
+        return float(value) >= minimum
+    except (TypeError, ValueError):
+        return False
+
+
+class ResultStore:
+    def __init__(self, path: Path, index_path: Optional[Path] = None):
+        self.path = Path(path)
+        self.index_path = Path(index_path) if index_path else self.path.with_name(f"{self.path.name}.idx")
+        self.entries: List[IndexEntry] = []
+        self.indexed_size = 0
+        self.by_name: Optional[Dict[str, List[IndexEntry]]] = None
+        self.file = None
+        self.map: Optional[mmap.mmap] = None
+
+    def __enter__(self) -> "ResultStore":
+        self.refresh()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def open_map(self) -> Optional[mmap.mmap]:
+        size = self.path.stat().st_size if self.path.exists() else 0
+        if self.map is not None and len(self.map) == size:
+            return self.map
+        self.close()
+        if size == 0:
+            return None
+        self.file = open(self.path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.map
+
+    def signature(self, data: mmap.mmap, size: int) -> Dict[str, Any]:
+        stat = os.fstat(self.file.fileno())
+        return {
+            "fields": list(HOT_FIELDS),
+            "inode": stat.st_ino,
+            "size": size,
+            "mtime_ns": stat.st_mtime_ns,
+            "head": hashlib.sha1(data[:min(size, SIGNATURE_BYTES)]).hexdigest(),
+            "tail": hashlib.sha1(data[max(0, size - SIGNATURE_BYTES):size]).hexdigest(),
+        }
+
+    def matches(self, signature: Optional[Dict[str, Any]], data: mmap.mmap, size: int) -> bool:
+        if signature is None or size > len(data):
+            return False
+        current = self.signature(data, size)
+        if any(signature.get(field) != current[field] for field in ("fields", "inode", "size", "head", "tail")):
+            return False
+        return len(data) > size or signature.get("mtime_ns") == current["mtime_ns"]
+
+    def load_index(self, data: Optional[mmap.mmap]):
+        self.entries, self.indexed_size = [], 0
+        if data is None or not self.index_path.exists():
+            return
+        entries: List[IndexEntry] = []
+        signature = None
+        end = 0
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                parsed = json.loads(line)
+                if isinstance(parsed, dict):
+                    signature = parsed
+                    continue
+                offset, length, hot = parsed
+                entries.extend(IndexEntry(offset, length, position, *fields) for position, fields in enumerate(hot))
+                end = offset + length + 1
+        if not self.matches(signature, data, end):
+            return
+        self.entries, self.indexed_size = entries, end
+
+    def refresh(self) -> int:
+        with FileLock(f"{self.index_path}.lock"):
+            data = self.open_map()
+            self.load_index(data)
+            if self.indexed_size == 0:
+                self.index_path.unlink(missing_ok=True)
+            self.by_name = None
+            if data is None:
+                return 0
+
+            added = 0
+            position = self.indexed_size
+            with open(self.index_path, "a", encoding="utf-8") as index:
+                while position < len(data):
+                    end = data.find(b"\n", position)
+                    if end == -1:
+                        break
+                    line = data[position:end]
+                    hot = []
+                    if line.strip():
+                        try:
+                            hot = [[record.get(field) for field in HOT_FIELDS] for record in line_records(line)]
+                        except json.JSONDecodeError:
+                            hot = []
+                    index.write(json.dumps([position, end - position, hot], ensure_ascii=False) + "\n")
+                    self.entries.extend(IndexEntry(position, end - position, i, *fields) for i, fields in enumerate(hot))
+                    added += len(hot)
+                    position = end + 1
+                if position != self.indexed_size:
+                    index.write(json.dumps(self.signature(data, position)) + "\n")
+            self.indexed_size = position
+            return added
+
+    def decode(self, offset: int, length: int) -> List[Dict[str, Any]]:
+        data = self.open_map()
+        return line_records(data[offset:offset + length])
+
+    def read(self, entry: IndexEntry) -> Dict[str, Any]:
+        return self.decode(entry.offset, entry.length)[entry.position]
+
+    def select(self, relevance: Optional[str] = None, min_uniqueness: Optional[float] = None,
+               min_combined: Optional[float] = None, predicate: Optional[Callable[[IndexEntry], bool]] = None) -> Iterator[IndexEntry]:
+        needle = relevance.lower() if relevance else None
+        for entry in self.entries:
+            if needle and not (isinstance(entry.relevance, str) and needle in entry.relevance.lower()):
+                continue
+            if min_uniqueness is not None and not score_at_least(entry.uniqueness_score, min_uniqueness):
+                continue
+            if min_combined is not None and not score_at_least(entry.combined_score, min_combined):
+                continue
+            if predicate and not predicate(entry):
+                continue
+            yield entry
+
+    def records(self, entries: Optional[Iterable[IndexEntry]] = None) -> Iterator[Dict[str, Any]]:
+        for (offset, length), group in groupby(self.entries if entries is None else entries, key=lambda e: (e.offset, e.length)):
+            decoded = self.decode(offset, length)
+            for entry in group:
+                yield decoded[entry.position]
+
+    def find(self, company_name: str) -> List[Dict[str, Any]]:
+        if self.by_name is None:
+            self.by_name = {}
+            for entry in self.entries:
+                self.by_name.setdefault((entry.company_name or "").lower(), []).append(entry)
+        return list(self.records(self.by_name.get(company_name.lower(), [])))
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build or refresh the offset index for a results JSONL file")
+    parser.add_argument("path", type=Path, nargs="?", default=Path("data/GED.json"))
+    parser.add_argument("--relevance", default=None)
+    args = parser.parse_args()
+
+    with ResultStore(args.path) as store:
+        matches = sum(1 for _ in store.select(relevance=args.relevance)) if args.relevance else len(store)
+        print(f"{len(store)} records indexed in {os.path.getsize(store.index_path)} bytes, {matches} matching")
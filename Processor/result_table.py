@@ -0,0 +1,139 @@
+import sys
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+
+SCORE_FIELDS = ("uniqueness_score", "effectiveness_score", "market_diff_score", "combined_score")
+CATEGORY_FIELDS = ("relevance", "confidence", "in_scope", "action")
+
+DTYPE = np.dtype(
+    [(name, np.float32) for name in SCORE_FIELDS]
+    + [(name, np.uint32) for name in CATEGORY_FIELDS]
+    + [("locator", np.int64)]
+)
+
+
+def as_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def score_value(value: np.float32) -> Any:
+    if np.isnan(value):
+        return None
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+class Categories:
+    def __init__(self):
+        self.values: List[Optional[str]] = [None]
+        self.codes: Dict[Optional[str], int] = {None: 0}
+
+    def code(self, value: Any) -> int:
+        if value is not None and not isinstance(value, str):
+            value = str(value)
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(sys.intern(value))
+        return code
+
+    def matching(self, needle: str) -> np.ndarray:
+        needle = needle.lower()
+        return np.array([i for i, v in enumerate(self.values) if v and needle in v.lower()], dtype=np.uint32)
+
+
+class ResultTable:
+    def __init__(self, fetch: Callable[[Iterable[int]], Iterator[Dict[str, Any]]], capacity: int = 1024):
+        self.fetch = fetch
+        self.rows = np.zeros(capacity, dtype=DTYPE)
+        self.names: List[str] = []
+        self.categories = {name: Categories() for name in CATEGORY_FIELDS}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @property
+    def nbytes(self) -> int:
+        return self.rows[:len(self)].nbytes + sum(sys.getsizeof(n) for n in self.names)
+
+    def append(self, locator: int, record: Dict[str, Any]):
+        size = len(self.names)
+        if size == len(self.rows):
+            self.rows = np.resize(self.rows, size * 2)
+        row = self.rows[size]
+        for name in SCORE_FIELDS:
+            row[name] = as_float(record.get(name))
+        for name in CATEGORY_FIELDS:
+            row[name] = self.categories[name].code(record.get(name))
+        row["locator"] = locator
+        self.names.append(record.get("company_name") or "")
+
+    @classmethod
+    def from_result_store(cls, store) -> "ResultTable":
+        table = cls(lambda locators: store.records(store.entries[i] for i in locators), max(len(store), 1))
+        for i, entry in enumerate(store.entries):
+            table.append(i, entry._asdict())
+        return table
+
+    @classmethod
+    def from_sqlite(cls, store) -> "ResultTable":
+        table = cls(store.records_by_rowid, max(len(store), 1))
+        for rowid, record in store.iter_rows(("company_name", *SCORE_FIELDS, *CATEGORY_FIELDS)):
+            table.append(rowid, record)
+        return table
+
+    @classmethod
+    def from_store(cls, store) -> "ResultTable":
+        return cls.from_sqlite(store) if hasattr(store, "iter_rows") else cls.from_result_store(store)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.rows[name][:len(self)]
+
+    def label(self, name: str, index: int) -> Optional[str]:
+        return self.categories[name].values[self.rows[name][index]]
+
+    def mask(self, relevance: Optional[str] = None, min_uniqueness: Optional[float] = None,
+             min_combined: Optional[float] = None, **categories: str) -> np.ndarray:
+        mask = np.ones(len(self), dtype=bool)
+        if relevance:
+            categories["relevance"] = relevance
+        for name, needle in categories.items():
+            mask &= np.isin(self.column(name), self.categories[name].matching(needle))
+        if min_uniqueness is not None:
+            mask &= self.column("uniqueness_score") >= min_uniqueness
+        if min_combined is not None:
+            mask &= self.column("combined_score") >= min_combined
+        return mask
+
+    def select(self, **filters) -> np.ndarray:
+        return np.flatnonzero(self.mask(**filters))
+
+    def rank(self, by: Tuple[str, ...] = ("combined_score", "uniqueness_score"), indices: Optional[np.ndarray] = None,
+             limit: Optional[int] = None) -> np.ndarray:
+        indices = np.arange(len(self)) if indices is None else np.asarray(indices)
+        keys = [np.nan_to_num(self.column(name)[indices], nan=-np.inf) for name in reversed(by)]
+        order = indices[np.lexsort(keys)[::-1]]
+        return order[:limit] if limit is not None else order
+
+    def summary(self, index: int) -> Dict[str, Any]:
+        row = self.rows[index]
+        summary: Dict[str, Any] = {"company_name": self.names[index]}
+        summary.update({name: score_value(row[name]) for name in SCORE_FIELDS})
+        summary.update({name: self.categories[name].values[row[name]] for name in CATEGORY_FIELDS})
+        return summary
+
+    def records(self, indices: Iterable[int]) -> Iterator[Dict[str, Any]]:
+        indices = list(indices)
+        locators = self.column("locator")[indices].tolist()
+        order = sorted(range(len(indices)), key=locators.__getitem__)
+        fetched = dict(zip((indices[i] for i in order), self.fetch(sorted(locators))))
+        for index in indices:
+            yield fetched[index]
+
+    def record(self, index: int) -> Dict[str, Any]:
+        return next(self.records([index]))
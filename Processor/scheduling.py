@@ -0,0 +1,87 @@
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import re
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+
+POSITIVE_TERMS = {
+    "battery": 3, "batteries": 3, "lithium": 3, "hydrogen": 3, "fusion": 3, "electrolys": 3,
+    "mobility": 3, "propulsion": 3, "motor": 2, "vehicle": 2, "auto": 1, "ev": 2, "charg": 2,
+    "energy": 2, "power": 1, "solar": 2, "fuel": 2, "recycl": 2, "circular": 2, "material": 2,
+    "robot": 1, "drone": 1, "aero": 1, "space": 1, "quantum": 1, "semicon": 1, "thermal": 1,
+}
+NEGATIVE_TERMS = {
+    "health": 3, "medic": 3, "pharma": 3, "bio": 2, "clinic": 3, "bank": 3, "pay": 2, "fintech": 3,
+    "finance": 3, "insur": 3, "cyber": 3, "secur": 2, "saas": 2, "cloud": 1, "analytics": 1,
+    "food": 2, "market": 1, "ads": 2, "legal": 2, "recruit": 2, "hr": 2,
+}
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def term_score(text: str, terms: Dict[str, int]) -> int:
+    tokens = TOKEN_RE.findall(text.lower())
+    joined = " ".join(tokens)
+    score = 0
+    for term, weight in terms.items():
+        if len(term) <= 3:
+            if term in tokens:
+                score += weight
+        elif term in joined:
+            score += weight
+    return score
+
+
+def keyword_score(item: Dict[str, Any]) -> float:
+    data = item.get("data") or {}
+    text = f"{data.get('name') or ''} {data.get('website') or ''}"
+    return term_score(text, POSITIVE_TERMS) - term_score(text, NEGATIVE_TERMS)
+
+
+def prior_results_scorer(results_path: Path, fallback: Callable[[Dict[str, Any]], float] = keyword_score) -> Callable[[Dict[str, Any]], float]:
+    scores: Dict[str, float] = {}
+    if Path(results_path).exists():
+        with open(results_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                for record in json.loads(line):
+                    name = (record.get("company_name") or "").lower()
+                    if name and isinstance(record.get("combined_score"), (int, float)):
+                        scores[name] = record["combined_score"]
+
+    def score(item: Dict[str, Any]) -> float:
+        name = ((item.get("data") or {}).get("name") or "").lower()
+        if name in scores:
+            return scores[name]
+        return fallback(item)
+
+    return score
+
+
+class PriorityItemQueue(asyncio.Queue):
+    def __init__(self, maxsize: int = 0, scorer: Optional[Callable[[Dict[str, Any]], float]] = None, aging: float = 0.01):
+        self.scorer = scorer or keyword_score
+        self.aging = aging
+        self.counter = itertools.count()
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self._queue = []
+
+    def _put(self, item):
+        seq = next(self.counter)
+        if item is None:
+            key = math.inf
+        else:
+            try:
+                key = seq * self.aging - self.scorer(item)
+            except Exception:
+                key = seq * self.aging
+        heapq.heappush(self._queue, (key, seq, item))
+
+    def _get(self):
+        return heapq.heappop(self._queue)[2]
@@ -0,0 +1,324 @@
+import datetime
+import json
+import sqlite3
+import sys
+from contextlib import closing
+from dataclasses import dataclass
+from logging import Logger
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from Processor.checkpoint_processor import ProcessingState
+from Processor.result_store import ResultStore
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    result_key TEXT PRIMARY KEY,
+    company_name TEXT,
+    relevance TEXT,
+    uniqueness_score REAL,
+    combined_score REAL,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_company ON results (company_name COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS results_relevance ON results (relevance);
+CREATE INDEX IF NOT EXISTS results_combined ON results (combined_score);
+CREATE INDEX IF NOT EXISTS results_uniqueness ON results (uniqueness_score);
+CREATE TABLE IF NOT EXISTS processed_items (
+    file_key TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    PRIMARY KEY (file_key, item_id)
+);
+CREATE TABLE IF NOT EXISTS state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class ResultRow(NamedTuple):
+    result_key: str
+    company_name: Optional[str]
+    relevance: Optional[str]
+    uniqueness_score: Any
+    combined_score: Any
+
+
+def as_score(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def decode_item_id(value: str) -> Any:
+    try:
+        return json.loads(value)
+    except json.JSONDecodeError:
+        return value
+
+
+class SQLiteStore:
+    def __init__(self, path: Path, timeout: float = 30.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.timeout = timeout
+        with closing(self.connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "SQLiteStore":
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @staticmethod
+    def result_row(key: str, record: Dict[str, Any], now: str) -> Tuple:
+        return (
+            key,
+            record.get("company_name"),
+            record.get("relevance") if isinstance(record.get("relevance"), str) else None,
+            as_score(record.get("uniqueness_score")),
+            as_score(record.get("combined_score")),
+            json.dumps(record, ensure_ascii=False),
+            now,
+        )
+
+    def commit(self, state: Dict[str, Any], results: List[Tuple[str, Dict[str, Any]]], processed: List[Tuple[str, Any]]):
+        now = datetime.datetime.now().isoformat()
+        with closing(self.connect()) as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(
+                "INSERT OR IGNORE INTO processed_items (file_key, item_id) VALUES (?, ?)",
+                [(key, json.dumps(item_id)) for key, item_id in processed]
+            )
+            conn.executemany(
+                """
+                INSERT INTO results (result_key, company_name, relevance, uniqueness_score, combined_score, data, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (result_key) DO UPDATE SET
+                    company_name = excluded.company_name, relevance = excluded.relevance,
+                    uniqueness_score = excluded.uniqueness_score, combined_score = excluded.combined_score,
+                    data = excluded.data, updated_at = excluded.updated_at
+                """,
+                [self.result_row(key, record, now) for key, record in results]
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)",
+                [(key, json.dumps(value)) for key, value in state.items()]
+            )
+            conn.execute("COMMIT")
+
+    def load_state(self) -> Tuple[Dict[str, Any], Dict[str, set]]:
+        with closing(self.connect()) as conn:
+            state = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM state")}
+            processed: Dict[str, set] = {}
+            for file_key, item_id in conn.execute("SELECT file_key, item_id FROM processed_items"):
+                processed.setdefault(file_key, set()).add(decode_item_id(item_id))
+        return state, processed
+
+    def select(self, relevance: Optional[str] = None, min_uniqueness: Optional[float] = None,
+               min_combined: Optional[float] = None, company_name: Optional[str] = None) -> List[ResultRow]:
+        clauses, params = [], []
+        if relevance:
+            clauses.append("relevance LIKE ?")
+            params.append(f"%{relevance}%")
+        if min_uniqueness is not None:
+            clauses.append("uniqueness_score >= ?")
+            params.append(min_uniqueness)
+        if min_combined is not None:
+            clauses.append("combined_score >= ?")
+            params.append(min_combined)
+        if company_name is not None:
+            clauses.append("company_name = ? COLLATE NOCASE")
+            params.append(company_name)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with closing(self.connect()) as conn:
+            rows = conn.execute(
+                f"SELECT result_key, company_name, relevance, uniqueness_score, combined_score FROM results {where} ORDER BY rowid",
+                params
+            ).fetchall()
+        return [ResultRow(*row) for row in rows]
+
+    def records(self, rows: Optional[Iterable[ResultRow]] = None, chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+        with closing(self.connect()) as conn:
+            if rows is None:
+                for (data,) in conn.execute("SELECT data FROM results ORDER BY rowid"):
+                    yield json.loads(data)
+                return
+            keys = [row.result_key for row in rows]
+            for start in range(0, len(keys), chunk_size):
+                chunk = keys[start:start + chunk_size]
+                placeholders = ",".join("?" * len(chunk))
+                found = dict(conn.execute(f"SELECT result_key, data FROM results WHERE result_key IN ({placeholders})", chunk))
+                for key in chunk:
+                    if key in found:
+                        yield json.loads(found[key])
+
+    def iter_rows(self, fields: Iterable[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        fields = list(fields)
+        columns = ", ".join(field if field in ResultRow._fields else f"json_extract(data, '$.{field}')" for field in fields)
+        with closing(self.connect()) as conn:
+            for rowid, *values in conn.execute(f"SELECT rowid, {columns} FROM results ORDER BY rowid"):
+                yield rowid, dict(zip(fields, values))
+
+    def records_by_rowid(self, rowids: Iterable[int], chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+        rowids = list(rowids)
+        with closing(self.connect()) as conn:
+            for start in range(0, len(rowids), chunk_size):
+                chunk = rowids[start:start + chunk_size]
+                placeholders = ",".join("?" * len(chunk))
+                found = dict(conn.execute(f"SELECT rowid, data FROM results WHERE rowid IN ({placeholders})", chunk))
+                for rowid in chunk:
+                    yield json.loads(found[rowid])
+
+    def find(self, company_name: str) -> List[Dict[str, Any]]:
+        return list(self.records(self.select(company_name=company_name)))
+
+    def merge(self, sources: Iterable[Path]) -> int:
+        merged = 0
+        with closing(self.connect()) as conn:
+            for source in sources:
+                conn.execute("ATTACH DATABASE ? AS source", (str(source),))
+                conn.execute("BEGIN IMMEDIATE")
+                merged += conn.execute(
+                    """
+                    INSERT OR REPLACE INTO results (result_key, company_name, relevance, uniqueness_score, combined_score, data, updated_at)
+                    SELECT result_key, company_name, relevance, uniqueness_score, combined_score, data, updated_at FROM source.results
+                    """
+                ).rowcount
+                conn.execute("COMMIT")
+                conn.execute("DETACH DATABASE source")
+        return merged
+
+    def __len__(self) -> int:
+        with closing(self.connect()) as conn:
+            return conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def export_jsonl(self, path: Path, batch_size: int = 10) -> int:
+        count = 0
+        batch: List[Dict[str, Any]] = []
+        with open(path, "w", encoding="utf-8") as f:
+            for record in self.records():
+                batch.append(record)
+                count += 1
+                if len(batch) == batch_size:
+                    f.write(json.dumps(batch, ensure_ascii=False) + "\n")
+                    batch = []
+            if batch:
+                f.write(json.dumps(batch, ensure_ascii=False) + "\n")
+        return count
+
+
+@dataclass
+class SQLiteProcessingState(ProcessingState):
+    store: Optional[SQLiteStore] = None
+
+    def snapshot(self) -> Dict:
+        return {
+            "processed_files": list(self.processed_files),
+            "current_file": self.current_file,
+            "total_processed": self.total_processed,
+            "total_items": self.total_items,
+            "file_totals": dict(self.file_totals),
+            "timestamp": datetime.datetime.now().isoformat()
+        }
+
+    def save_checkpoint(self, logger: Logger, CONFIG: Dict, results: List, path: Path, data: Optional[Dict] = None, keys: Optional[List[Tuple[str, Any]]] = None):
+        keys = keys or []
+        self.store.commit(
+            data or self.snapshot(),
+            [(f"{key}:{item_id}", result) for (key, item_id), result in zip(keys, results)],
+            keys
+        )
+        results.clear()
+        logger.info(f"Checkpoint saved: {self.total_processed}/{self.total_items} items processed")
+
+    @classmethod
+    def load_checkpoint(cls, logger: Logger, CONFIG: Dict) -> "SQLiteProcessingState":
+        store = SQLiteStore(sqlite_path(CONFIG))
+        data, processed = store.load_state()
+        state = cls(store=store)
+        state.processed_files = set(data.get("processed_files", []))
+        state.processed_items = processed
+        state.current_file = data.get("current_file")
+        state.total_processed = data.get("total_processed", 0)
+        state.file_totals = data.get("file_totals", {})
+        state.total_items = data.get("total_items", 0)
+        if data:
+            logger.info(f"Checkpoint loaded from {store.path}: {state.total_processed}/{state.total_items} items already processed")
+        else:
+            logger.info("No checkpoint found, starting fresh")
+        return state
+
+
+def sqlite_path(CONFIG: Dict) -> Path:
+    return CONFIG.get("SQLITE_PATH") or CONFIG["CHECKPOINT_DIR"] / "pipeline.db"
+
+
+def state_class(CONFIG: Dict):
+    return SQLiteProcessingState if CONFIG.get("STORAGE") == "sqlite" else ProcessingState
+
+
+def open_result_store(CONFIG: Dict, results_path: Path):
+    if CONFIG.get("STORAGE") == "sqlite":
+        return SQLiteStore(sqlite_path(CONFIG))
+    return ResultStore(results_path)
+
+
+def migrate(db_path: Path, state_path: Optional[Path], results_path: Optional[Path], batch_size: int = 1000) -> Tuple[int, int]:
+    store = SQLiteStore(db_path)
+    state: Dict[str, Any] = {}
+    processed: List[Tuple[str, Any]] = []
+    if state_path and state_path.exists():
+        with open(state_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        processed = [(key, item_id) for key, ids in data.pop("processed_items", {}).items() for item_id in ids]
+        state = data
+
+    migrated = 0
+    if results_path and results_path.exists():
+        with ResultStore(results_path) as results:
+            batch: List[Tuple[str, Dict[str, Any]]] = []
+            for entry, record in zip(results.entries, results.records()):
+                batch.append((f"migrated:{entry.offset}:{entry.position}", record))
+                if len(batch) >= batch_size:
+                    store.commit({}, batch, [])
+                    migrated += len(batch)
+                    batch = []
+            store.commit({}, batch, [])
+            migrated += len(batch)
+
+    store.commit(state, [], processed)
+    return migrated, len(processed)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migrate JSON checkpoint/results files into the SQLite store, or export it back")
+    sub = parser.add_subparsers(dest="command", required=True)
+    m = sub.add_parser("migrate")
+    m.add_argument("--db", type=Path, default=Path("checkpoints/pipeline.db"))
+    m.add_argument("--state", type=Path, default=Path("checkpoints/processing_state.json"))
+    m.add_argument("--results", type=Path, default=Path("data/GED.json"))
+    e = sub.add_parser("export")
+    e.add_argument("--db", type=Path, default=Path("checkpoints/pipeline.db"))
+    e.add_argument("--output", type=Path, default=Path("data/GED.json"))
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        results, items = migrate(args.db, args.state, args.results)
+        print(f"Migrated {results} results and {items} processed item ids into {args.db}")
+    else:
+        if args.output.exists():
+            sys.exit(f"{args.output} already exists, refusing to overwrite")
+        print(f"Exported {SQLiteStore(args.db).export_jsonl(args.output)} results to {args.output}")
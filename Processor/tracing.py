@@ -0,0 +1,236 @@
+import argparse
+import json
+import random
+import threading
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from opentelemetry import baggage, context as otel_context, trace
+from opentelemetry.trace import SpanContext, Status, StatusCode, TraceFlags
+
+
+class FileSpan(trace.Span):
+    def __init__(self, name: str, span_context: SpanContext, parent: Optional[SpanContext], exporter: "FileSpanExporter",
+                 attributes: Optional[Dict[str, Any]] = None, start_time: Optional[int] = None):
+        self.name = name
+        self.span_context = span_context
+        self.parent = parent
+        self.exporter = exporter
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.events: List[Dict[str, Any]] = []
+        self.status = Status(StatusCode.UNSET)
+        self.start_time = start_time or time.time_ns()
+        self.end_time: Optional[int] = None
+
+    def get_span_context(self) -> SpanContext:
+        return self.span_context
+
+    def set_attributes(self, attributes):
+        self.attributes.update(attributes)
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, attributes=None, timestamp: Optional[int] = None):
+        self.events.append({"name": name, "time": timestamp or time.time_ns(), "attributes": dict(attributes or {})})
+
+    def update_name(self, name: str):
+        self.name = name
+
+    def is_recording(self) -> bool:
+        return self.end_time is None
+
+    def set_status(self, status, description: Optional[str] = None):
+        if isinstance(status, Status):
+            self.status = status
+        else:
+            self.status = Status(status, description)
+
+    def record_exception(self, exception: BaseException, attributes=None, timestamp: Optional[int] = None, escaped: bool = False):
+        self.add_event("exception", {
+            "exception.type": exception.__class__.__name__,
+            "exception.message": str(exception),
+            "exception.stacktrace": "".join(traceback.format_exception(exception))[-2000:],
+            **dict(attributes or {})
+        }, timestamp)
+
+    def end(self, end_time: Optional[int] = None):
+        if self.end_time is not None:
+            return
+        self.end_time = end_time or time.time_ns()
+        self.exporter.export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": format(self.span_context.trace_id, "032x"),
+            "span_id": format(self.span_context.span_id, "016x"),
+            "parent_id": format(self.parent.span_id, "016x") if self.parent else None,
+            "start": self.start_time / 1e9,
+            "duration_ms": (self.end_time - self.start_time) / 1e6,
+            "status": self.status.status_code.name,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+class FileSpanExporter:
+    def __init__(self, path: Path, buffer_size: int = 256):
+        self.path = Path(path)
+        self.buffer_size = buffer_size
+        self.buffer: List[str] = []
+        self.lock = threading.RLock()
+        self.writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="span-writer")
+        self.pending: Set[Future] = set()
+        self.errors: List[BaseException] = []
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, span: FileSpan):
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str)
+        with self.lock:
+            self.buffer.append(line)
+            if len(self.buffer) >= self.buffer_size:
+                self.submit()
+
+    def submit(self):
+        lines, self.buffer = self.buffer, []
+        if not lines:
+            return
+        future = self.writer.submit(self.write, lines)
+        self.pending.add(future)
+        future.add_done_callback(self.written)
+
+    def written(self, future: Future):
+        with self.lock:
+            self.pending.discard(future)
+            if future.exception() is not None:
+                self.errors.append(future.exception())
+
+    def write(self, lines: List[str]):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def flush(self):
+        with self.lock:
+            self.submit()
+            pending = list(self.pending)
+        wait(pending)
+        with self.lock:
+            errors, self.errors = self.errors, []
+        if errors:
+            raise errors[0]
+
+    def shutdown(self):
+        try:
+            self.flush()
+        finally:
+            self.writer.shutdown(wait=True)
+
+
+class FileTracer(trace.Tracer):
+    def __init__(self, exporter: FileSpanExporter, baggage_keys: tuple):
+        self.exporter = exporter
+        self.baggage_keys = baggage_keys
+
+    def start_span(self, name, context=None, kind=trace.SpanKind.INTERNAL, attributes=None, links=None,
+                   start_time=None, record_exception=True, set_status_on_exception=True) -> trace.Span:
+        parent = trace.get_current_span(context).get_span_context()
+        if not parent.is_valid:
+            parent = None
+        span_context = SpanContext(
+            trace_id=parent.trace_id if parent else random.getrandbits(128),
+            span_id=random.getrandbits(64),
+            is_remote=False,
+            trace_flags=TraceFlags(TraceFlags.SAMPLED),
+        )
+        tags = {k: v for k in self.baggage_keys if (v := baggage.get_baggage(k, context)) is not None}
+        return FileSpan(name, span_context, parent, self.exporter, {**tags, **dict(attributes or {})}, start_time)
+
+    @contextmanager
+    def start_as_current_span(self, name, context=None, kind=trace.SpanKind.INTERNAL, attributes=None, links=None,
+                              start_time=None, record_exception=True, set_status_on_exception=True,
+                              end_on_exit=True) -> Iterator[trace.Span]:
+        span = self.start_span(name, context, kind, attributes, links, start_time)
+        with trace.use_span(span, end_on_exit=end_on_exit, record_exception=record_exception,
+                            set_status_on_exception=set_status_on_exception) as current:
+            yield current
+
+
+class FileTracerProvider(trace.TracerProvider):
+    def __init__(self, path: Path, baggage_keys: tuple = ("company", "dataset")):
+        self.exporter = FileSpanExporter(path)
+        self.baggage_keys = baggage_keys
+
+    def get_tracer(self, instrumenting_module_name, instrumenting_library_version=None, schema_url=None, attributes=None) -> trace.Tracer:
+        return FileTracer(self.exporter, self.baggage_keys)
+
+    def force_flush(self):
+        self.exporter.flush()
+
+    def shutdown(self):
+        self.exporter.shutdown()
+
+
+def configure_tracing(path: Path) -> FileTracerProvider:
+    provider = FileTracerProvider(path)
+    trace.set_tracer_provider(provider)
+    return provider
+
+
+@contextmanager
+def tagged(**tags) -> Iterator[None]:
+    ctx = otel_context.get_current()
+    for key, value in tags.items():
+        if value is not None:
+            ctx = baggage.set_baggage(key, str(value), ctx)
+    token = otel_context.attach(ctx)
+    try:
+        yield
+    finally:
+        otel_context.detach(token)
+
+
+def load_spans(path: Path) -> List[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def summarize(spans: List[Dict[str, Any]], slowest: int = 5) -> str:
+    durations = defaultdict(list)
+    for span in spans:
+        label = span["name"]
+        stage = span["attributes"].get("stage")
+        durations[f"{label}[{stage}]" if stage else label].append(span["duration_ms"])
+
+    lines = [f"{'span':<40}{'count':>8}{'p50 ms':>12}{'p99 ms':>12}{'total s':>12}"]
+    for label, values in sorted(durations.items(), key=lambda kv: -sum(kv[1])):
+        values.sort()
+        p50 = values[len(values) // 2]
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+        lines.append(f"{label:<40}{len(values):>8}{p50:>12.1f}{p99:>12.1f}{sum(values) / 1000:>12.1f}")
+
+    roots = sorted((s for s in spans if s["name"] == "pipeline.item"), key=lambda s: -s["duration_ms"])[:slowest]
+    by_trace = defaultdict(list)
+    for span in spans:
+        by_trace[span["trace_id"]].append(span)
+    for root in roots:
+        lines.append(f"\n{root['attributes'].get('company', root['trace_id'])}: {root['duration_ms'] / 1000:.1f}s")
+        for child in sorted(by_trace[root["trace_id"]], key=lambda s: s["start"]):
+            if child is root:
+                continue
+            stage = child["attributes"].get("stage", "")
+            lines.append(f"  {child['name']:<24}{stage:<12}{child['duration_ms'] / 1000:>8.2f}s {child['status']}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a span file written with TRACE_FILE")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--slowest", type=int, default=5)
+    args = parser.parse_args()
+    print(summarize(load_spans(args.path), args.slowest))
@@ -0,0 +1,385 @@
+import argparse
+import asyncio
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from benchmarks import synthetic
+
+
+RESULTS_DIR = ROOT / "benchmarks" / "results"
+DEFAULT_SIZES = [1000, 100000, 1000000]
+ANONYMIZER_CAP = 2000
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def timed_calls(fn: Callable, inputs) -> List[float]:
+    latencies = []
+    for value in inputs:
+        start = time.perf_counter()
+        fn(value)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def bench_prepare_file(workdir: Path, size: int, args) -> Dict:
+    from prepare import prepare_file
+
+    source = workdir / "companies.csv"
+    synthetic.write_csv(source, size)
+    start = time.perf_counter()
+    prepare_file(source, workdir / "prepared")
+    return {"items": size, "seconds": time.perf_counter() - start}
+
+
+def bench_pipeline(workdir: Path, size: int, args) -> Dict:
+    os.chdir(workdir)
+    import main
+    from Data_Enrichment_Google.enrichment1 import run_enrichment
+    from Processor.backends import ReplayBackend, set_backend
+    from Processor.credential_pool import CredentialPool
+
+    logger = logging.getLogger("benchmarks.pipeline")
+    logger.setLevel(logging.WARNING)
+    logger.propagate = False
+
+    synthetic.write_companies(workdir / "data", size)
+    recordings = workdir / "recordings.jsonl"
+    synthetic.write_recordings(recordings)
+    set_backend(ReplayBackend(recordings, latency_median=args.llm_latency, latency_sigma=0.5, seed=1))
+    credentials = CredentialPool(["benchmark-key"], rate_limit=(size * 10, 1))
+
+    latencies = []
+
+    async def process(log, data, limiter=None, base_data={}):
+        start = time.perf_counter()
+        try:
+            return await run_enrichment(log, data, limiter, base_data, credentials=credentials)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    config = dict(
+        main.CONFIG,
+        CHECKPOINT_DIR=workdir / "checkpoints",
+        ENRICHED_DATA_PATH=workdir / "GED.json",
+        CHECKPOINT_INTERVAL=args.checkpoint_interval,
+        MAX_CONCURRENT_REQUESTS=args.workers,
+        QUEUE_SIZE=args.workers * 10,
+        WORK_QUEUE_PATH=workdir / "checkpoints" / "work_queue.db",
+        NODE_ID=None,
+    )
+    start = time.perf_counter()
+    asyncio.run(main.runner(
+        workdir / "data", "data", logger, config, process, {}, config["ENRICHED_DATA_PATH"],
+        rate_limit=(size * 10, 1), max_concurrent_sessions=args.workers
+    ))
+    seconds = time.perf_counter() - start
+    checkpoint = config["CHECKPOINT_DIR"] / "processing_state.json"
+    return {
+        "items": size,
+        "seconds": seconds,
+        "latencies": latencies,
+        "checkpoint_bytes": checkpoint.stat().st_size if checkpoint.exists() else 0,
+        "results_bytes": config["ENRICHED_DATA_PATH"].stat().st_size,
+    }
+
+
+def bench_checkpoint(workdir: Path, size: int, args) -> Dict:
+    from Processor.checkpoint_processor import ProcessingState
+
+    logger = logging.getLogger("benchmarks.checkpoint")
+    logger.setLevel(logging.WARNING)
+    config = {"CHECKPOINT_DIR": workdir / "checkpoints"}
+    state = ProcessingState()
+    chunk = 1000
+    for start in range(0, size, chunk):
+        state.processed_files.add(f"companies_{start // chunk + 1}.json")
+        state.processed_items[f"data:companies_{start // chunk + 1}.json"] = set(range(min(chunk, size - start)))
+    state.total_processed = size
+    state.total_items = chunk
+
+    rng = random.Random(3)
+    results_path = workdir / "GED.json"
+    rounds = args.checkpoint_rounds
+    start = time.perf_counter()
+    saves = timed_calls(
+        lambda i: state.save_checkpoint(logger, config, [synthetic.result_record(i, rng)], results_path),
+        range(rounds)
+    )
+    loads = timed_calls(lambda _: ProcessingState.load_checkpoint(logger, config), range(rounds))
+    seconds = time.perf_counter() - start
+    return {
+        "items": rounds * 2,
+        "seconds": seconds,
+        "latencies": saves + loads,
+        "save_p50": percentile(saves, 50),
+        "load_p50": percentile(loads, 50),
+        "checkpoint_bytes": (config["CHECKPOINT_DIR"] / "processing_state.json").stat().st_size,
+    }
+
+
+def bench_extractors(workdir: Path, size: int, args) -> Dict:
+    from company_info import GeminiChat
+    from Data_Enrichment.data_enrichment import PerplexityChat
+    from Data_Enrichment_Google.enrichment1 import extract_json_from_markdown
+
+    rng = random.Random(5)
+    responses = [synthetic.markdown_response(i, rng) for i in range(size)]
+    reasoning = [
+        f"<think>scoring</think>\n```json\n{json.dumps(synthetic.result_record(i, rng))}\n```"
+        for i in range(size // 3 or 1)
+    ]
+    chat = PerplexityChat.__new__(PerplexityChat)
+    start = time.perf_counter()
+    latencies = timed_calls(extract_json_from_markdown, responses)
+    latencies += timed_calls(GeminiChat.extract_json_from_markdown, responses)
+    latencies += timed_calls(chat.extract_json_from_markdown_reasoning, reasoning)
+    return {"items": len(latencies), "seconds": time.perf_counter() - start, "latencies": latencies}
+
+
+def bench_anonymizer(workdir: Path, size: int, args) -> Dict:
+    try:
+        from company_anonimizer import SpaCyJsonAnonymizer
+    except (ImportError, OSError) as e:
+        return {"skipped": f"{e.__class__.__name__}: {e}"}
+
+    rng = random.Random(9)
+    count = min(size, ANONYMIZER_CAP)
+    records = [synthetic.result_record(i, rng) for i in range(count)]
+    anonymizer = SpaCyJsonAnonymizer()
+    start = time.perf_counter()
+    latencies = timed_calls(anonymizer.anonymize, records)
+    return {"items": count, "seconds": time.perf_counter() - start, "latencies": latencies}
+
+
+def bench_csv_export(workdir: Path, size: int, args) -> Dict:
+    os.chdir(workdir)
+    import json_to_csv
+    import json_to_csv2
+    from main import jsonl_to_json
+
+    results_path = workdir / "GED.json"
+    synthetic.write_results(results_path, size)
+    rng = random.Random(13)
+    legacy = [synthetic.legacy_record(i, rng) for i in range(size)]
+    start = time.perf_counter()
+    count = json_to_csv2.export_csv(jsonl_to_json(results_path), workdir / "GED.csv")
+    count += json_to_csv.export_csv(legacy, workdir / "output.csv")
+    return {"items": count, "seconds": time.perf_counter() - start}
+
+
+def bench_result_store(workdir: Path, size: int, args) -> Dict:
+    from Processor.result_store import ResultStore
+
+    results_path = workdir / "GED.json"
+    synthetic.write_results(results_path, size)
+    start = time.perf_counter()
+    with ResultStore(results_path) as store:
+        build = time.perf_counter() - start
+    with ResultStore(results_path) as store:
+        latencies = timed_calls(lambda _: sum(1 for _ in store.records(store.select(relevance="investment"))), range(5))
+    return {
+        "items": size,
+        "seconds": time.perf_counter() - start,
+        "latencies": latencies,
+        "index_build_seconds": build,
+        "index_bytes": store.index_path.stat().st_size,
+    }
+
+
+def bench_result_table(workdir: Path, size: int, args) -> Dict:
+    from Processor.result_store import ResultStore
+    from Processor.result_table import ResultTable
+
+    results_path = workdir / "GED.json"
+    synthetic.write_results(results_path, size)
+    start = time.perf_counter()
+    with ResultStore(results_path) as store:
+        table = ResultTable.from_store(store)
+        build = time.perf_counter() - start
+        latencies = timed_calls(lambda _: table.rank(indices=table.select(relevance="investment", min_uniqueness=5), limit=100), range(20))
+        top = list(table.records(table.rank(limit=100)))
+    return {
+        "items": size,
+        "seconds": time.perf_counter() - start,
+        "latencies": latencies,
+        "table_build_seconds": build,
+        "table_bytes": table.nbytes,
+        "top_records": len(top),
+    }
+
+
+def bench_ranking(workdir: Path, size: int, args) -> Dict:
+    from Processor.ranking import apply_rules, load_results, shortlist
+
+    results_path = workdir / "GED.json"
+    synthetic.write_results(results_path, size)
+    start = time.perf_counter()
+    frame = load_results(results_path)
+    load = time.perf_counter() - start
+    latencies = timed_calls(lambda _: shortlist(apply_rules(frame), top=100), range(5))
+    return {
+        "items": size,
+        "seconds": time.perf_counter() - start,
+        "latencies": latencies,
+        "load_seconds": load,
+    }
+
+
+BENCHMARKS = {
+    "prepare_file": bench_prepare_file,
+    "pipeline": bench_pipeline,
+    "checkpoint": bench_checkpoint,
+    "extractors": bench_extractors,
+    "anonymizer": bench_anonymizer,
+    "csv_export": bench_csv_export,
+    "result_store": bench_result_store,
+    "result_table": bench_result_table,
+    "ranking": bench_ranking,
+}
+
+
+def summarize(raw: Dict) -> Dict:
+    if "skipped" in raw:
+        return raw
+    latencies = raw.pop("latencies", None)
+    summary = dict(raw)
+    summary["items_per_sec"] = raw["items"] / raw["seconds"] if raw["seconds"] else None
+    if latencies:
+        summary["p50_ms"] = percentile(latencies, 50) * 1000
+        summary["p99_ms"] = percentile(latencies, 99) * 1000
+    return summary
+
+
+def run_one(name: str, size: int, args) -> Dict:
+    with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as tmp:
+        cwd = os.getcwd()
+        try:
+            summary = summarize(BENCHMARKS[name](Path(tmp), size, args))
+        finally:
+            os.chdir(cwd)
+    summary["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return summary
+
+
+def run_isolated(name: str, size: int, args) -> Dict:
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1, maxtasksperchild=1) as pool:
+        return pool.apply(run_one, (name, size, args))
+
+
+def version_label() -> str:
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        sha = "unknown"
+    return f"{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}-{sha}"
+
+
+def latest_results(exclude: Optional[Path] = None) -> Optional[Path]:
+    runs = sorted(p for p in RESULTS_DIR.glob("*.json") if p != exclude)
+    return runs[-1] if runs else None
+
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    regressions = []
+    checks = [("items_per_sec", -1), ("p99_ms", 1), ("peak_rss_mb", 1), ("checkpoint_bytes", 1)]
+    for key, summary in current["results"].items():
+        previous = baseline["results"].get(key)
+        if not previous or "skipped" in summary or "skipped" in previous:
+            continue
+        for metric, direction in checks:
+            new, old = summary.get(metric), previous.get(metric)
+            if not new or not old:
+                continue
+            change = (new - old) / old
+            if change * direction > threshold:
+                regressions.append(f"{key} {metric}: {old:.4g} -> {new:.4g} ({change:+.1%})")
+    return regressions
+
+
+def print_table(results: Dict[str, Dict]):
+    print(f"{'benchmark':<26}{'items/s':>14}{'p50 ms':>10}{'p99 ms':>10}{'rss MB':>10}{'ckpt bytes':>14}")
+    for key, summary in results.items():
+        if "skipped" in summary:
+            print(f"{key:<26}skipped ({summary['skipped']})")
+            continue
+        cells = [summary.get("items_per_sec"), summary.get("p50_ms"), summary.get("p99_ms"), summary.get("peak_rss_mb")]
+        row = "".join(f"{c:>10.2f}" if c is not None else f"{'-':>10}" for c in cells[1:])
+        ckpt = summary.get("checkpoint_bytes")
+        print(f"{key:<26}{cells[0]:>14.1f}{row}{ckpt if ckpt is not None else '-':>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmarks for the enrichment pipeline")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--label", default=None)
+    parser.add_argument("--baseline", type=Path, default=None)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--checkpoint-interval", type=int, default=10)
+    parser.add_argument("--checkpoint-rounds", type=int, default=50)
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    results = {}
+    for size in args.sizes:
+        for name in args.only:
+            key = f"{name}@{size}"
+            print(f"Running {key}...", flush=True)
+            results[key] = run_isolated(name, size, args)
+
+    run = {
+        "label": args.label or version_label(),
+        "timestamp": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "options": {k: v for k, v in vars(args).items() if k not in ("baseline", "label", "no_save")},
+        "results": results,
+    }
+    print_table(results)
+
+    output = RESULTS_DIR / f"{run['label']}.json"
+    baseline_path = args.baseline or latest_results(exclude=output)
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(run, baseline, args.threshold)
+        print(f"Compared against {baseline['label']}: {len(regressions)} regressions")
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(run, f, indent=2)
+        print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
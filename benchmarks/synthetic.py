@@ -0,0 +1,116 @@
+import csv
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+
+RELEVANCE = ["INVESTMENT", "ADJACENT", "FUTURE", "TOOL", "FALSE"]
+CONFIDENCE = ["High", "Medium", "Low"]
+SECTORS = ["battery", "hydrogen", "mobility", "fintech", "health", "robotics", "materials", "saas", "solar", "cyber"]
+
+
+def company_name(i: int) -> str:
+    return f"{SECTORS[i % len(SECTORS)].title()} Labs {i}"
+
+
+def write_csv(path: Path, size: int):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["Account Name", "Website"])
+        writer.writeheader()
+        for i in range(size):
+            writer.writerow({"Account Name": company_name(i), "Website": f"https://company{i}.example.com"})
+
+
+def write_companies(directory: Path, size: int, chunk_size: int = 1000) -> List[Path]:
+    directory.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for start in range(0, size, chunk_size):
+        path = directory / f"companies_{start // chunk_size + 1}.json"
+        chunk = [
+            {"name": company_name(i), "website": f"https://company{i}.example.com"}
+            for i in range(start, min(start + chunk_size, size))
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(chunk, f)
+        paths.append(path)
+    return paths
+
+
+def result_record(i: int, rng: random.Random) -> Dict:
+    uniqueness, effectiveness, market = rng.randint(0, 10), rng.randint(0, 10), rng.randint(0, 10)
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit [1, 2]. " * 3
+    return {
+        "company_name": company_name(i),
+        "relevance": rng.choice(RELEVANCE),
+        "explanation": text,
+        "uniqueness_score": uniqueness,
+        "uniqueness_why": text,
+        "effectiveness_score": effectiveness,
+        "effectiveness_why": text,
+        "market_diff_score": market,
+        "combined_score": round(uniqueness * 0.5 + effectiveness * 0.3 + market * 0.2),
+        "confidence": rng.choice(CONFIDENCE),
+        "brief_description": text,
+        "wow_one_liner": "None" if uniqueness <= 4 else "First-of-kind breakthrough",
+        "founders": text,
+        "technologies": text,
+        "applications": text,
+        "products": text,
+        "customer_engagements": text,
+        "hq_location": "Tokyo, Japan",
+        "current_funding_information": "Seed, $2M, 2024",
+        "core_technology_used": "solid-state batteries, electric propulsion",
+        "known_development_stage": "Prototype",
+        "action": "Monitor"
+    }
+
+
+def legacy_record(i: int, rng: random.Random) -> Dict:
+    text = "Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 3
+    return {
+        "brief_description": text,
+        "uniqueness_score": rng.randint(0, 10),
+        "confidence_uniqueness": rng.choice(CONFIDENCE),
+        "effectiveness_score": rng.randint(0, 10),
+        "confidence_effectiveness": rng.choice(CONFIDENCE),
+        "reasoning_for_uniqueness_or_impact": text,
+        "long_description": {
+            "founders": text,
+            "technologies": text,
+            "applications": text,
+            "products": text,
+            "customer_engagements": text
+        },
+        "hq_location": {"country": "Japan", "state_or_province": "Tokyo", "city": "Minato"},
+        "funding_info": {"last_round": "Seed", "amount": "$2M", "date": "2024", "valuation": "N/A"},
+        "core_technology": ["solid-state batteries", "electric propulsion"],
+        "applications": ["mobility", "energy storage"],
+        "development_stage": "Prototype"
+    }
+
+
+def write_results(path: Path, size: int, per_line: int = 10, seed: int = 7):
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for start in range(0, size, per_line):
+            json.dump([result_record(i, rng) for i in range(start, min(start + per_line, size))], f, ensure_ascii=False)
+            f.write("\n")
+
+
+def markdown_response(i: int, rng: random.Random) -> str:
+    return "Here is the analysis.\n```json\n" + json.dumps(result_record(i, rng), indent=2) + "\n```\n"
+
+
+def write_recordings(path: Path):
+    rng = random.Random(11)
+    entries = [
+        {"stage": "research", "response": json.dumps({"basic_information": {"company_name": "Synthetic"}, "description": "N/A"})},
+        {"stage": "comparison", "response": "Company B aligns with Company A's mobility thesis."},
+        {"stage": "scoring", "response": markdown_response(0, rng)},
+        {"stage": "prescreen", "response": json.dumps({"plausible": True, "reason": "synthetic"})},
+        {"stage": "rescoring", "response": "```json\n[]\n```"},
+    ]
+    with open(path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
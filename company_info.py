@@ -1,6 +1,6 @@
-from google import genai
-from google.genai import types
-from typing import Any, Dict
+from opentelemetry import trace
+from Processor.backends import get_backend
+from typing import Any, Dict, Optional
 from dotenv import load_dotenv
 
 import asyncio
@@ -10,6 +10,7 @@ import re
 
 
 load_dotenv()
+tracer = trace.get_tracer(__name__)
 
 
 class Prompt:
@@ -119,31 +120,21 @@ Output Format (JSON preferred, or Markdown if JSON isn't possible):
 class GeminiChat:
     __model_name: str = "gemini-2.5-pro"
 
-    def __init__(self, api_key: str, prompt: str):
+    def __init__(self, api_key: str, prompt: str, model_name: Optional[str] = None, backend=None):
         self.prompt = prompt
         self.api_key = api_key
+        self.model_name = model_name or self.__model_name
+        self.backend = backend
 
         if not self.api_key:
             raise EnvironmentError("GEMINI_KEY environment variable not set")
 
     async def send_request(self):
-        client = genai.Client(
-            api_key=self.api_key
-        ).aio
-        grounding_tool = types.Tool(
-            google_search=types.GoogleSearch()
-        )
-        config = types.GenerateContentConfig(
-            tools=[grounding_tool]
-        )
-        response = await client.models.generate_content(
-            model=self.__model_name,
-            contents=self.prompt,
-            config=config,
-        )
-        return response.text
-
-    def extract_json_from_markdown(self, completion: str) -> Dict[str, Any]:
+        with tracer.start_as_current_span("llm.send_request", attributes={"model": self.model_name, "grounded": True}):
+            return await (self.backend or get_backend()).generate(self.api_key, self.model_name, self.prompt)
+
+    @staticmethod
+    def extract_json_from_markdown(completion: str) -> Dict[str, Any]:
         try:
             raw_content = completion.strip()
 
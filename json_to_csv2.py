@@ -1,77 +1,105 @@
-import json
+import argparse
 import csv
 import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Union
+
+from Processor.result_store import ResultStore
+from Processor.result_table import ResultTable
+from Processor.sqlite_store import SQLiteStore
+
+
+FIELDNAMES = [
+    "Company Name",
+    "Relevance",
+    "Uniqueness Score",
+    "Uniqueness Why?",
+    "Function/Effectiveness score",
+    "Effectiveness Why?",
+    "Market Difference Score",
+    "Combined Score",
+    "Confidence Level",
+    "Brief Description",
+    "Wow!",
+    "Founders",
+    "Technologies",
+    "Applications",
+    "Products",
+    "Customer Engagements",
+    "HQ",
+    "Funding Information",
+    "Core Technology",
+    "Development Stage",
+    "Action"
+]
 
 
 def remove_citations(text: str) -> str:
     return re.sub(r' \[\d+(?:, \d+)*\]', '', text)
 
-with open("data/GED.json", "r", encoding="utf-8") as f:
-    data = json.load(f)
+def clean_items(data: Iterable[Dict]) -> Iterator[Dict]:
+    for item in data:
+        new_item = {}
+        for key, value in item.items():
+            if isinstance(value, str):
+                new_item[key] = remove_citations(value)
+            else:
+                new_item[key] = value
+        yield new_item
 
-new_data = []
-for item in data:
-    new_item = {}
-    for key, value in item.items():
-        if isinstance(value, str):
-            new_item[key] = remove_citations(value)
-        else:
-            new_item[key] = value
-    new_data.append(new_item)
-
-csv_file = "GED.csv"
-with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
-    writer = csv.DictWriter(file, fieldnames=[
-        "Company Name",
-        "Relevance",
-        "Uniqueness Score",
-        "Uniqueness Why?",
-        "Function/Effectiveness score",
-        "Effectiveness Why?",
-        "Market Difference Score",
-        "Combined Score",
-        "Confidence Level",
-        "Brief Description",
-        "Wow!",
-        "Founders",
-        "Technologies",
-        "Applications",
-        "Products",
-        "Customer Engagements",
-        "HQ",
-        "Funding Information",
-        "Core Technology",
-        "Development Stage",
-        "Action"
-    ])
+def to_row(item: Dict) -> Dict:
+    return {
+        "Company Name": item.get("company_name"),
+        "Relevance": item.get("relevance"),
+        "Uniqueness Score": item.get("uniqueness_score"),
+        "Uniqueness Why?": item.get("uniqueness_why"),
+        "Function/Effectiveness score": item.get("effectiveness_score"),
+        "Effectiveness Why?": item.get("effectiveness_why"),
+        "Market Difference Score": item.get("market_diff_score"),
+        "Combined Score": item.get("combined_score"),
+        "Confidence Level": item.get("confidence"),
+        "Brief Description": item.get("brief_description"),
+        "Wow!": item.get("wow_one_liner"),
+        "Founders": item.get("founders"),
+        "Technologies": item.get("technologies"),
+        "Applications": item.get("applications"),
+        "Products": item.get("products"),
+        "Customer Engagements": item.get("customer_engagements"),
+        "HQ": item.get("hq_location"),
+        "Funding Information": item.get("current_funding_information"),
+        "Core Technology": item.get("core_technology_used"),
+        "Development Stage": item.get("known_development_stage"),
+        "Action": item.get("action", "")
+    }
 
-    writer.writeheader()
+def export_csv(data: Iterable[Dict], csv_file: Union[str, Path]) -> int:
+    count = 0
+    with open(csv_file, mode='w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=FIELDNAMES)
+        writer.writeheader()
+        for item in clean_items(data):
+            writer.writerow(to_row(item))
+            count += 1
+    return count
 
-    for item in new_data:
-        row = {
-            "Company Name": item["company_name"],
-            "Relevance": item["relevance"],
-            "Uniqueness Score": item["uniqueness_score"],
-            "Uniqueness Why?": item["uniqueness_why"],
-            "Function/Effectiveness score": item["effectiveness_score"],
-            "Effectiveness Why?": item["effectiveness_why"],
-            "Market Difference Score": item["market_diff_score"],
-            "Combined Score": item["combined_score"],
-            "Confidence Level": item["confidence"],
-            "Brief Description": item["brief_description"],
-            "Wow!": item["wow_one_liner"],
-            "Founders": item["founders"],
-            "Technologies": item["technologies"],
-            "Applications": item["applications"],
-            "Products": item["products"],
-            "Customer Engagements": item["customer_engagements"],
-            "HQ": item["hq_location"],
-            "Funding Information": item["current_funding_information"],
-            "Core Technology": item["core_technology_used"],
-            "Development Stage": item["known_development_stage"],
-            "Action": item.get("action", "")
-        }
 
-        writer.writerow(row)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export enriched results to CSV")
+    parser.add_argument("--results", type=Path, default=Path("data/GED.json"))
+    parser.add_argument("--sqlite", type=Path, default=None)
+    parser.add_argument("--output", default="GED.csv")
+    parser.add_argument("--relevance", default=None)
+    parser.add_argument("--min-combined", type=float, default=None)
+    parser.add_argument("--rank", action="store_true", help="Sort rows by combined then uniqueness score")
+    parser.add_argument("--top", type=int, default=None)
+    args = parser.parse_args()
 
-print(f"✅ CSV file written to: {csv_file}")
+    with (SQLiteStore(args.sqlite) if args.sqlite else ResultStore(args.results)) as store:
+        if args.rank or args.top:
+            table = ResultTable.from_store(store)
+            ranked = table.rank(indices=table.select(relevance=args.relevance, min_combined=args.min_combined), limit=args.top)
+            count = export_csv(table.records(ranked), args.output)
+        else:
+            selected = store.select(relevance=args.relevance, min_combined=args.min_combined)
+            count = export_csv(store.records(selected), args.output)
+    print(f"✅ {count} rows written to: {args.output}")
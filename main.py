@@ -1,13 +1,29 @@
 import asyncio
-import json
 import logging
 import os
 
 from aiolimiter import AsyncLimiter
-from Data_Enrichment_Google.enrichment1 import run_enrichment as g_enrichment, compare_companies
+from Data_Enrichment_Google.batch_mode import BatchEnrichment, GeminiBatchClient
+from Data_Enrichment_Google.enrichment1 import run_enrichment as g_enrichment, compare_companies, extract_json_from_markdown, validate_enrichment
+from Data_Enrichment_Google.model_router import ModelRouter
+from Data_Enrichment_Google.prescreen import KeywordPreScreener, ModelPreScreener, load_descriptions
+from functools import partial
 from pathlib import Path
-from Processor.checkpoint_processor import ProcessingState
+from Processor.backends import RecordingBackend, get_backend, set_backend
+from Processor.circuit_breaker import CircuitBreaker
+from Processor.concurrency import ConcurrencyController
+from Processor.credential_pool import CredentialPool
 from Processor.data_pipeline import DataPipeline
+from Processor.distributed import SQLiteWorkQueue, merge_shards, shard_path
+from Processor.file_io import load_jsonl, read_json, rename
+from Processor.hedging import Hedger
+from Processor.post_processor import PostProcessor
+from Processor.profiler import LoopProfiler, watch_slow_callbacks
+from Processor.progress import ProgressTracker
+from Processor.rescore_cache import RescoreCache, merge_rescored, rescored_records, write_batches
+from Processor.result_table import ResultTable, score_value
+from Processor.sqlite_store import SQLiteStore, open_result_store, sqlite_path, state_class
+from Processor.tracing import configure_tracing
 
 
 logging.basicConfig(
@@ -23,41 +39,193 @@ CONFIG = {
     "ENRICHED_DATA_PATH": Path("data/GED.json"),
     "CHECKPOINT_DIR": Path("checkpoints/"),
     "CHECKPOINT_INTERVAL": 10,
+    "STORAGE": os.environ.get("STORAGE", "json"),
+    "SQLITE_PATH": None,
     "QUEUE_SIZE": 100,
-    "MAX_CONCURRENT_REQUESTS": 10
+    "MAX_CONCURRENT_REQUESTS": 10,
+    "POST_PROCESS_WORKERS": 0,
+    "POST_PROCESS_BATCH_SIZE": 16,
+    "POST_PROCESS_MAX_PENDING": 256,
+    "POST_PROCESS_ANONYMIZE": False,
+    "NODE_ID": os.environ.get("NODE_ID"),
+    "WORK_QUEUE_PATH": Path("checkpoints/work_queue.db"),
+    "LEASE_SIZE": 50,
+    "LEASE_TTL": 300,
+    "KEY_RATE_LIMIT": (10, 1),
+    "KEY_DAILY_QUOTA": None,
+    "DYNAMIC_CONCURRENCY": False,
+    "MIN_WORKERS": 2,
+    "MAX_WORKERS": 50,
+    "TARGET_RATE": None,
+    "CONCURRENCY_INTERVAL": 10,
+    "ITEM_TIMEOUT": 900,
+    "REQUEST_TIMEOUT": 300,
+    "STAGE_TIMEOUTS": {"research": 300, "comparison": 240, "scoring": 240, "rescoring": 600},
+    "HEDGE_REQUESTS": False,
+    "BREAKER_FAILURE_RATIO": 0.5,
+    "BREAKER_MIN_CALLS": 10,
+    "BREAKER_WINDOW": 50,
+    "BREAKER_OPEN_SECONDS": 60,
+    "CIRCUIT_OPEN_POLICY": "park",
+    "RETRIES": 3,
+    "RESCORE_CACHE_PATH": None,
+    "RESCORE_CALIBRATION_RATE": 0.05,
+    "STAGE_TWO_BATCH_SIZE": 25,
+    "STAGE_TWO_CONCURRENCY": 3,
+    "RESCORED_DATA_PATH": Path("data/GED_rescored.json"),
+    "REPLAY_DEAD_LETTERS": os.environ.get("REPLAY_DEAD_LETTERS") == "1",
+    "DLQ_REPLAY_CONCURRENCY": 3,
+    "DLQ_MAX_ATTEMPTS": 12,
+    "PRIORITY_SCHEDULING": False,
+    "PRIORITY_SCORER": None,
+    "PRIORITY_AGING": 0.01,
+    "PRESCREEN": None,
+    "PRESCREEN_MODEL": "gemini-2.5-flash-lite",
+    "MODEL_CASCADES": {
+        "research": ["gemini-2.5-pro"],
+        "comparison": ["gemini-2.5-pro"],
+        "scoring": ["gemini-2.5-pro"],
+        "rescoring": ["gemini-2.5-pro"]
+    },
+    "MODEL_COSTS": {"gemini-2.5-flash-lite": 0.05, "gemini-2.5-flash": 0.2, "gemini-2.5-pro": 1.0},
+    "ESCALATION_THRESHOLD": 6,
+    "ESCALATION_MARGIN": 1,
+    "BATCH_MODE": os.environ.get("BATCH_MODE") == "1",
+    "BATCH_MODEL": "gemini-2.5-pro",
+    "BATCH_DIR": Path("checkpoints/batches"),
+    "BATCH_POLL_INTERVAL": 60,
+    "METRICS_SNAPSHOT_INTERVAL": 30,
+    "METRICS_PORT": int(os.environ["METRICS_PORT"]) if os.environ.get("METRICS_PORT") else None,
+    "PROGRESS_INTERVAL": 30,
+    "PROGRESS_WINDOW": 300,
+    "PROGRESS_TERMINAL": os.environ.get("PROGRESS_TERMINAL") == "1",
+    "PROGRESS_PORT": int(os.environ["PROGRESS_PORT"]) if os.environ.get("PROGRESS_PORT") else None,
+    "TRACE_FILE": Path(os.environ["TRACE_FILE"]) if os.environ.get("TRACE_FILE") else None,
+    "PROFILE": os.environ.get("PROFILE") == "1",
+    "PROFILE_DIR": Path("checkpoints/profile"),
+    "PROFILE_INTERVAL": 0.01,
+    "TASK_SAMPLE_INTERVAL": 1.0,
+    "BLOCKING_THRESHOLD": 0.1,
+    "LOOP_DEBUG": os.environ.get("LOOP_DEBUG") == "1",
+    "SLOW_CALLBACK_MS": 100
 }
 
 def jsonl_to_json(file: Path):
-    with file.open("r", encoding="utf-8") as f:
-        items = [part for line in f if line.strip() for part in json.loads(line)]
-    return items
+    return load_jsonl(file)
 
-async def runner(path, file_name, log_file, config, task_to_run, base_data, enriched_data, rate_limit, max_concurrent_sessions):
-    ps = ProcessingState()
-    pipeline = DataPipeline(ps, log_file, dataset_paths=[path], CONFIG=config)
+async def build_prescreener(config, credentials, hedger):
+    if not config.get("PRESCREEN"):
+        return None
+    descriptions = await asyncio.to_thread(load_descriptions, config["ENRICHED_DATA_PATH"])
+    if config["PRESCREEN"] == "model":
+        return ModelPreScreener(credentials, config["PRESCREEN_MODEL"], hedger, descriptions)
+    return KeywordPreScreener(descriptions)
+
+async def runner(path, file_name, log_file, config, task_to_run, base_data, enriched_data, rate_limit, max_concurrent_sessions, work_queue=None, replay=False, validator=None):
+    ps = await asyncio.to_thread(state_class(config).load_checkpoint, log_file, config)
+    post_processor = PostProcessor.from_config(config, parser=extract_json_from_markdown, validator=validator)
+    breaker = CircuitBreaker.from_config(config, log_file)
+    pipeline = DataPipeline(ps, log_file, dataset_paths=[path], CONFIG=config, resume=False, post_processor=post_processor, breaker=breaker)
 
     limiter = AsyncLimiter(*rate_limit) if rate_limit else None
     semaphore = asyncio.Semaphore(max_concurrent_sessions) if max_concurrent_sessions else None
+    workers = config["DLQ_REPLAY_CONCURRENCY"] if replay else config["MAX_CONCURRENT_REQUESTS"]
+    controller_task = None
+    if config.get("DYNAMIC_CONCURRENCY") and not replay:
+        pipeline.controller = ConcurrencyController.from_config(pipeline, log_file, config, rate_limit)
+        semaphore = None
+        workers = config["MIN_WORKERS"]
+
+    checkpoint_task = asyncio.create_task(pipeline.checkpointer.run(enriched_data))
+    metrics_tasks = []
+    if config.get("METRICS_SNAPSHOT_INTERVAL"):
+        metrics_tasks.append(asyncio.create_task(
+            pipeline.metrics.run_snapshots(config["CHECKPOINT_DIR"] / "metrics.json", config["METRICS_SNAPSHOT_INTERVAL"])
+        ))
+    if config.get("METRICS_PORT"):
+        metrics_tasks.append(asyncio.create_task(pipeline.metrics.serve(port=config["METRICS_PORT"])))
+    progress = ProgressTracker.from_config(pipeline, log_file, config)
+    if config.get("PROGRESS_INTERVAL"):
+        metrics_tasks.append(asyncio.create_task(progress.run(config["PROGRESS_INTERVAL"], config.get("PROGRESS_TERMINAL", False))))
+    if config.get("PROGRESS_PORT"):
+        metrics_tasks.append(asyncio.create_task(progress.serve(port=config["PROGRESS_PORT"])))
 
+    if replay:
+        producer = pipeline.replay_producer()
+    elif work_queue:
+        producer = pipeline.distributed_producer(file_name, path, work_queue, config["NODE_ID"])
+    else:
+        producer = pipeline.producer(file_name, path)
     producer_tasks = [
-        asyncio.create_task(pipeline.producer(file_name, path))
+        asyncio.create_task(producer)
     ]
 
-    consumer_tasks = [
-        asyncio.create_task(pipeline.consumer(task_to_run, i, limiter, semaphore, base_data, enriched_data))
-            for i in range(CONFIG["MAX_CONCURRENT_REQUESTS"])
-    ]
+    pipeline.configure_consumers(task_to_run, limiter, semaphore, base_data)
+    for _ in range(workers):
+        pipeline.start_consumer()
+    if pipeline.controller:
+        controller_task = asyncio.create_task(pipeline.controller.run())
 
     await asyncio.gather(*producer_tasks)
 
-    for _ in range(CONFIG["MAX_CONCURRENT_REQUESTS"]):
-        await pipeline.queue.put(None)
-
-    await asyncio.gather(*consumer_tasks)
+    if controller_task:
+        controller_task.cancel()
+    await pipeline.stop_consumers()
+    await post_processor.close()
+    await pipeline.checkpointer.close()
+    await checkpoint_task
+    for task in metrics_tasks:
+        task.cancel()
+    await asyncio.gather(*metrics_tasks, return_exceptions=True)
+    log_file.info(progress.summary(progress.snapshot()))
     return pipeline
 
 async def stage_one(path, file_name, log_file, config, run_process, enriched_data, base_data):
+    work_queue = None
+    node_id = config.get("NODE_ID")
+    if node_id:
+        work_queue = await asyncio.to_thread(SQLiteWorkQueue, config["WORK_QUEUE_PATH"])
+        node_config = dict(config, CHECKPOINT_DIR=config["CHECKPOINT_DIR"] / node_id)
+        enriched_data = shard_path(enriched_data, node_id)
+    else:
+        node_config = config
+
     await runner(
+        path,
+        file_name,
+        log_file,
+        node_config,
+        run_process,
+        base_data,
+        enriched_data,
+        rate_limit=(10, 1),
+        max_concurrent_sessions=config["MAX_CONCURRENT_REQUESTS"],
+        work_queue=work_queue,
+        validator=validate_enrichment,
+    )
+
+    merging = work_queue is not None and await asyncio.to_thread(work_queue.claim_merge, node_id)
+    if work_queue is not None and not merging:
+        owner = await asyncio.to_thread(work_queue.merge_owner)
+        log_file.info(f"[{node_id}] " + (f"Shards already merged by {owner}" if owner else "Ranges still in progress on other nodes"))
+    if merging and config["STORAGE"] == "sqlite":
+        shards = sorted(p for p in config["CHECKPOINT_DIR"].glob("*/pipeline.db"))
+        count = await asyncio.to_thread(SQLiteStore(sqlite_path(config)).merge, shards)
+        log_file.info(f"[{node_id}] All ranges complete, merged {count} records from {len(shards)} node databases")
+    elif merging:
+        target = config["ENRICHED_DATA_PATH"]
+        shards = sorted(p for p in target.parent.glob(f"{target.stem}.*{target.suffix}") if p != target)
+        count = await asyncio.to_thread(merge_shards, shards, target)
+        log_file.info(f"[{node_id}] All ranges complete, merged {count} records from {len(shards)} shards")
+    return work_queue is None or merging
+
+async def replay_dead_letters(path, file_name, log_file, config, run_process, enriched_data, base_data):
+    node_id = config.get("NODE_ID")
+    if node_id:
+        config = dict(config, CHECKPOINT_DIR=config["CHECKPOINT_DIR"] / node_id)
+        enriched_data = shard_path(enriched_data, node_id)
+
+    pipeline = await runner(
         path,
         file_name,
         log_file,
@@ -66,24 +234,88 @@ async def stage_one(path, file_name, log_file, config, run_process, enriched_dat
         base_data,
         enriched_data,
         rate_limit=(10, 1),
-        max_concurrent_sessions=CONFIG["MAX_CONCURRENT_REQUESTS"],
+        max_concurrent_sessions=config["DLQ_REPLAY_CONCURRENCY"],
+        replay=True,
+        validator=validate_enrichment,
     )
+    await asyncio.to_thread(pipeline.dead_letters.compact)
+    remaining = len(await asyncio.to_thread(pipeline.dead_letters.load))
+    log_file.info(f"Dead-letter replay finished, {remaining} items still failing")
+
+async def batch_stage(path, file_name, log_file, config, client, enriched_data, base_data):
+    post_processor = PostProcessor.from_config(config, parser=extract_json_from_markdown, validator=validate_enrichment)
+    ps = await asyncio.to_thread(state_class(config).load_checkpoint, log_file, config)
+    pipeline = DataPipeline(ps, log_file, dataset_paths=[path], CONFIG=config, resume=False, post_processor=post_processor)
+    await BatchEnrichment(pipeline, client, log_file, config, base_data).run(file_name, path, enriched_data)
+    await post_processor.close()
+    return pipeline
 
-async def stage_two(enriched_data, base_data, log_file, run_process):
-    items = jsonl_to_json(enriched_data)
-    investments = [
+def investment_candidates(enriched_data: Path, config):
+    with open_result_store(config, enriched_data) as store:
+        table = ResultTable.from_store(store)
+    ranked = table.rank(("uniqueness_score",), table.select(relevance="investment"))
+    return [
         {
-            "name": item.get("name"),
-            "uniqueness_score": item.get("uniqueness_score"),
-            "relevance": item.get("relevance")
+            "name": table.names[i],
+            "uniqueness_score": score_value(table.rows["uniqueness_score"][i]),
+            "relevance": table.label("relevance", i)
         }
-        for item in items
-        if "relevance" in item and isinstance(item["relevance"], str)
-        and "investment" in item["relevance"].lower()
+        for i in ranked
     ]
-    return run_process(investments, base_data, log_file)
+
+async def rescore_batch(logger, batch, limiter=None, base_data=None, run_process=None):
+    companies = rescored_records(await run_process(logger, base_data, batch["companies"]))
+    if not companies:
+        return None
+    return {"batch": batch["batch"], "base": batch["base"], "candidates": batch["companies"], "companies": companies}
+
+async def stage_two(enriched_data, base_data, log_file, run_process, config=CONFIG):
+    stage_config = dict(
+        config,
+        CHECKPOINT_DIR=config["CHECKPOINT_DIR"] / "stage_two",
+        STORAGE="json",
+        SQLITE_PATH=None,
+        CHECKPOINT_INTERVAL=1,
+        PRIORITY_SCHEDULING=False,
+        DYNAMIC_CONCURRENCY=False,
+    )
+    stage_dir = stage_config["CHECKPOINT_DIR"]
+    sink = stage_dir / "rescored.json"
+    cache = await asyncio.to_thread(RescoreCache.from_config(config, log_file).load)
+    await asyncio.to_thread(cache.fold, sink, base_data)
+    await asyncio.to_thread(reset_stage, stage_dir)
+
+    investments = await asyncio.to_thread(investment_candidates, enriched_data, config)
+    changed, calibration, _ = cache.plan(investments, base_data)
+    submitted = changed + calibration
+    if submitted:
+        await asyncio.to_thread(write_batches, stage_dir / "input", submitted, base_data, config["STAGE_TWO_BATCH_SIZE"])
+        await runner(
+            stage_dir / "input",
+            "rescore",
+            log_file,
+            stage_config,
+            partial(rescore_batch, run_process=run_process),
+            base_data,
+            sink,
+            rate_limit=(10, 1),
+            max_concurrent_sessions=config["STAGE_TWO_CONCURRENCY"],
+        )
+        await asyncio.to_thread(cache.fold, sink, base_data)
+        await asyncio.to_thread(reset_stage, stage_dir)
+
+    rescored = cache.current(investments, base_data)
+    total, merged = await asyncio.to_thread(merge_rescored, open_result_store(config, enriched_data), rescored, config["RESCORED_DATA_PATH"])
+    log_file.info(f"[Stage two] {len(rescored)}/{len(investments)} candidates re-scored, merged into {merged}/{total} records at {config['RESCORED_DATA_PATH']}")
+    return list(rescored.values())
+
+def reset_stage(stage_dir: Path):
+    for path in [*stage_dir.glob("input/*.json"), stage_dir / "processing_state.json"]:
+        path.unlink(missing_ok=True)
 
 async def main():
+    if CONFIG["LOOP_DEBUG"]:
+        watch_slow_callbacks(asyncio.get_running_loop(), CONFIG["SLOW_CALLBACK_MS"])
     dataset_paths = [
         ("data", CONFIG["FILE_PATH"].parent),
         ("new_honda_f", CONFIG["DATA_PATH"].parent)
@@ -94,15 +326,48 @@ async def main():
     enriched = CONFIG["ENRICHED_DATA_PATH"]
     honda_details = None
     honda_path = f"{dataset_paths[1][1]}/{dataset_paths[1][0]}.json"
-    with open(honda_path, "r") as honda_file:
-        honda_details = json.load(honda_file)
+    honda_details = await read_json(honda_path)
     honda_path_jsonl = honda_path.replace(".json", ".jsonl")
-    os.rename(honda_path, honda_path_jsonl)
-    await stage_one(path, file_name, logger, CONFIG, g_enrichment, enriched, honda_details)
-    await stage_two(enriched, honda_details, logger, compare_companies)
+    await rename(honda_path, honda_path_jsonl)
+    if os.environ.get("RECORD_RESPONSES"):
+        set_backend(RecordingBackend(get_backend(), Path(os.environ["RECORD_RESPONSES"])))
+    credentials = CredentialPool.from_env(
+        "GEMINI_KEY",
+        rate_limit=CONFIG["KEY_RATE_LIMIT"],
+        daily_quota=CONFIG["KEY_DAILY_QUOTA"]
+    )
+    hedger = Hedger.from_config(CONFIG)
+    router = ModelRouter.from_config(CONFIG)
+    prescreen = await build_prescreener(CONFIG, credentials, hedger)
+    enrich = partial(g_enrichment, credentials=credentials, hedger=hedger, prescreen=prescreen, router=router, raw=bool(CONFIG["POST_PROCESS_WORKERS"]))
+    if CONFIG["REPLAY_DEAD_LETTERS"]:
+        await replay_dead_letters(path, file_name, logger, CONFIG, enrich, enriched, honda_details)
+        return
+    if CONFIG["BATCH_MODE"]:
+        if not credentials:
+            raise RuntimeError("GEMINI_KEY (or comma-separated GEMINI_KEYS) environment variable not set.")
+        client = GeminiBatchClient(credentials.credentials[0].key)
+        await batch_stage(path, file_name, logger, CONFIG, client, enriched, honda_details)
+        return
+
+    if not await stage_one(path, file_name, logger, CONFIG, enrich, enriched, honda_details):
+        logger.info(f"[{CONFIG['NODE_ID']}] Skipping stage two on this node")
+        return
+    rescored = await stage_two(enriched, honda_details, logger, partial(compare_companies, credentials=credentials, hedger=hedger, router=router))
+    logger.info(f"[Stage two] {len(rescored)} investment candidates re-scored")
+    logger.info(f"Request latency stats: {hedger.stats()}")
+    logger.info(f"Model tier stats: {router.stats()}")
 
     return
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    tracing = configure_tracing(CONFIG["TRACE_FILE"]) if CONFIG["TRACE_FILE"] else None
+    run = main()
+    if CONFIG["PROFILE"]:
+        run = LoopProfiler.from_config(CONFIG, logger).run(run)
+    try:
+        asyncio.run(run)
+    finally:
+        if tracing:
+            tracing.shutdown()
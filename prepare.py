@@ -22,6 +22,8 @@ def prepare_file(file_path: Path, output_dir: Path, chunk_size: int = 1000):
             json.dump(chunk, json_file, indent=4, ensure_ascii=False)
 
 
-fp = Path("data/data.csv")
-op = Path("data")
-prepare_file(fp, op)
\ No newline at end of file
+
+if __name__ == "__main__":
+    fp = Path("data/data.csv")
+    op = Path("data")
+    prepare_file(fp, op)